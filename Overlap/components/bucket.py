@@ -1,19 +1,63 @@
-import tkinter as tk
-from tkinter import ttk
-import nltk
+"""
+Keyword extraction and bucket classification for activity reviews.
+
+This module is the importable core: it has no GUI and no import-time side
+effects. NLTK and its corpora are loaded on first use, from local data when
+it is already installed (see `ensure_nltk_data`). The Tk front end lives in
+`bucket_gui.py`.
+"""
+import os
 import random
-from nltk.corpus import stopwords
-from nltk import pos_tag, word_tokenize
-from nltk.corpus import wordnet as wn
+import threading
+from collections import namedtuple
 from functools import lru_cache
 
-# Download necessary NLTK data (only the first time)
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('averaged_perceptron_tagger')
-nltk.download('averaged_perceptron_tagger_eng')
-nltk.download('stopwords')
-nltk.download('wordnet')
+import bucket_stats
+from bucket_model import BucketModel
+
+# NLTK packages the classifier needs, keyed by download id, with the path
+# nltk.data.find uses to look for a local copy.
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "averaged_perceptron_tagger": "taggers/averaged_perceptron_tagger",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+}
+
+class MissingNLTKDataError(LookupError):
+    """NLTK data the classifier needs is not installed (see ensure_nltk_data)."""
+
+def ensure_nltk_data(download=True):
+    """
+    Makes sure every package in NLTK_RESOURCES is available locally.
+    Only missing packages are downloaded, so this never touches the network
+    once the data is installed. With download=False, or when a download
+    fails, raises MissingNLTKDataError naming the missing packages.
+    """
+    import nltk
+
+    missing = []
+    for package, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if not (download and nltk.download(package, quiet=True)):
+                missing.append(package)
+    if missing:
+        raise MissingNLTKDataError(
+            "Missing NLTK data: %s. Install it with nltk.download() or set NLTK_DATA." % ", ".join(missing)
+        )
+
+@lru_cache(maxsize=None)
+def load_nltk():
+    """Imports NLTK and checks its data on first use; later calls are free."""
+    ensure_nltk_data()
+    import nltk
+    import nltk.corpus
+
+    return nltk
 
 # Define 50 buckets with associated keywords (no subcategory mapping)
 category_keywords = {
@@ -174,35 +218,61 @@ activities_sample = [
 ]
 activities = activities_sample  # 100 distinct items
 
-# Global dictionary to store liked keywords grouped by bucket
-liked_buckets = {}
-
 # ------------------ NLTK Keyword Extraction ------------------
-def extract_keywords_nltk(text, num_keywords=2):
+@lru_cache(maxsize=None)
+def english_stopwords():
+    """The NLTK English stopword list as a set, built once per process."""
+    return frozenset(load_nltk().corpus.stopwords.words("english"))
+
+def filter_tokens(tokens):
+    """Keeps alphabetic tokens that are not stopwords."""
+    stop_words = english_stopwords()
+    return [token for token in tokens if token.isalpha() and token.lower() not in stop_words]
+
+def select_keywords(filtered_tokens, tagged, num_keywords=2):
     """
-    Extract up to `num_keywords` single-word keywords from text using NLTK.
-    The function tokenizes the text, removes stopwords, and selects only nouns.
+    Picks the most frequent nouns from POS-tagged tokens, falling back to the
+    most frequent filtered tokens when there are no nouns.
     """
-    tokens = word_tokenize(text)
-    stop_words = set(stopwords.words("english"))
-    filtered_tokens = [token for token in tokens if token.isalpha() and token.lower() not in stop_words]
-    tagged = pos_tag(filtered_tokens)
+    FreqDist = load_nltk().FreqDist
     noun_tokens = [word for word, tag in tagged if tag.startswith("NN")]
     
     if not noun_tokens:
-        from nltk import FreqDist
         freq_tokens = FreqDist(filtered_tokens)
         return [word for word, count in freq_tokens.most_common(num_keywords)]
     
-    from nltk import FreqDist
     freq = FreqDist(noun_tokens)
     top_keywords = [word for word, count in freq.most_common(num_keywords)]
     return top_keywords
 
+def extract_keywords_nltk(text, num_keywords=2):
+    """
+    Extract up to `num_keywords` single-word keywords from text using NLTK.
+    The function tokenizes the text, removes stopwords, and selects only nouns.
+    """
+    nltk = load_nltk()
+    t0 = bucket_stats.start()
+    tokens = nltk.word_tokenize(text)
+    t0 = bucket_stats.lap("extract.word_tokenize", t0)
+    filtered_tokens = filter_tokens(tokens)
+    t0 = bucket_stats.lap("extract.filter", t0)
+    tagged = nltk.pos_tag(filtered_tokens)
+    t0 = bucket_stats.lap("extract.pos_tag", t0)
+    keywords = select_keywords(filtered_tokens, tagged, num_keywords)
+    bucket_stats.lap("extract.select", t0)
+    return keywords
+
 # ------------------ Caching for WordNet Synsets ------------------
+# WordNetCorpusReader seeks and reads one shared file handle per part of
+# speech without locking, so threads looking up synsets at the same time can
+# read each other's lines. Everything that may read the WordNet files holds
+# this lock.
+_wordnet_lock = threading.RLock()
+
 @lru_cache(maxsize=1024)
 def cached_synsets(word):
-    return wn.synsets(word)
+    with _wordnet_lock:
+        return load_nltk().corpus.wordnet.synsets(word)
 
 # ------------------ Enhanced Bucket Finder Using WordNet ------------------
 def word_similarity(word1, word2):
@@ -215,283 +285,711 @@ def word_similarity(word1, word2):
     if not synsets1 or not synsets2:
         return 0
     max_sim = 0
-    for syn1 in synsets1:
-        for syn2 in synsets2:
-            sim = syn1.path_similarity(syn2)
-            if sim and sim > max_sim:
-                max_sim = sim
+    with _wordnet_lock:
+        for syn1 in synsets1:
+            for syn2 in synsets2:
+                sim = syn1.path_similarity(syn2)
+                if sim and sim > max_sim:
+                    max_sim = sim
     return max_sim
 
+# A classification plus the tier that produced it: "substring", "ngram" or
+# "wordnet". confidence is 1.0 for substring hits, the cosine score for the
+# n-gram tier, and the path similarity for WordNet (None when the result
+# came from the persistent cache).
+BucketResult = namedtuple("BucketResult", ["bucket", "tier", "confidence"])
+
 def find_bucket_for_keyword(keyword):
     """
     Determines the best bucket for the given keyword by computing semantic similarity
     between the keyword and candidate bucket words from category_keywords.
     """
-    best_bucket = "Other"
-    best_sim = 0.0
+    return classify_keyword(keyword).bucket
+
+def find_bucket_id_for_keyword(keyword):
+    """find_bucket_for_keyword as a get_bucket_model() bucket id."""
+    return classify_keyword_id(keyword)[0]
+
+def classify_keyword(keyword):
+    """
+    Like find_bucket_for_keyword, but returns a BucketResult saying which tier
+    answered. The tiers after the substring check depend on configure_classifier().
+    """
+    bucket_id, tier, confidence = classify_keyword_id(keyword)
+    return BucketResult(get_bucket_model().buckets[bucket_id], tier, confidence)
 
+def classify_keyword_id(keyword):
+    """
+    The classifier itself: returns (bucket id, tier, confidence) with ids from
+    get_bucket_model(). The string-returning functions above are views of it.
+    """
     # First, try a direct substring check for a quick match.
-    for bucket, patterns in category_keywords.items():
-        for pat in patterns:
-            if pat in keyword.lower():
-                return bucket
-
-    # If no direct match, use WordNet similarity.
-    for bucket, patterns in category_keywords.items():
-        for pat in patterns:
-            sim = word_similarity(keyword, pat)
-            if sim > best_sim:
-                best_sim = sim
-                best_bucket = bucket
-                # Early exit if a high similarity is found
-                if best_sim > 0.5:
+    t0 = bucket_stats.start()
+    bucket_id = get_pattern_automaton().best_bucket_id(keyword)
+    t0 = bucket_stats.lap("classify.substring", t0)
+    if bucket_id is not None:
+        return bucket_id, "substring", 1.0
+
+    # Keywords a warm-start snapshot already knows never reach NLTK.
+    snapshot = _snapshot
+    if snapshot is not None:
+        known = snapshot.lookup(keyword)
+        t0 = bucket_stats.lap("classify.snapshot", t0)
+        if known is not None:
+            return known
+
+    # Then the n-gram tier, when enabled, unless it is unsure of the answer.
+    model = get_bucket_model()
+    if _classifier_mode != "wordnet":
+        bucket_id, confidence = get_ngram_classifier().classify_id(keyword)
+        t0 = bucket_stats.lap("classify.ngram", t0)
+        if _classifier_mode == "ngram" or confidence >= _ngram_threshold:
+            return (model.other_id if bucket_id is None else bucket_id), "ngram", confidence
+        bucket_stats.incr("classify.ngram_escalated")
+
+    # Otherwise use the precomputed WordNet similarity index, remembering the
+    # answer across processes when a persistent cache is on.
+    cache = _persistent_cache
+    if cache is not None:
+        bucket_id = model.bucket_ids.get(cache.get_bucket(keyword))
+        t0 = bucket_stats.lap("classify.persistent_cache", t0)
+        if bucket_id is not None:
+            return bucket_id, "wordnet", None
+    bucket_id, similarity = get_similarity_index().best_match_id(keyword)
+    t0 = bucket_stats.lap("classify.wordnet", t0)
+    if bucket_id is None:
+        bucket_id = model.other_id
+    if cache is not None:
+        cache.put_bucket(keyword, model.buckets[bucket_id])
+        bucket_stats.lap("classify.persistent_cache", t0)
+    return bucket_id, "wordnet", similarity
+
+# ------------------ Interned Bucket Model ------------------
+_bucket_model = None
+
+def get_bucket_model():
+    """
+    Bucket and pattern ids for category_keywords, shared by every classifier
+    tier. Ids are table order, with "Other" last.
+    """
+    global _bucket_model
+    if _bucket_model is None:
+        _bucket_model = BucketModel(category_keywords)
+    return _bucket_model
+
+# ------------------ Precomputed Bucket Similarity Index ------------------
+@lru_cache(maxsize=4096)
+def synset_ancestors(synset):
+    """
+    Returns (ancestors, root_depth, needs_root) for a synset, where ancestors is
+    a tuple of (hypernym name, shortest distance) pairs sorted by distance, the
+    synset itself included. This is the same data Synset.path_similarity walks
+    on every call, so it is worth computing only once per synset.
+    """
+    with _wordnet_lock:
+        paths = synset._shortest_hypernym_paths(False)
+        needs_root = synset._needs_root()
+    ancestors = tuple(sorted(((s.name(), d) for s, d in paths.items()), key=lambda item: item[1]))
+    return ancestors, ancestors[-1][1] + 1, needs_root
+
+@lru_cache(maxsize=4096)
+def word_ancestors(word):
+    """
+    synset_ancestors() for every synset of `word`, read through the snapshot
+    and the persistent cache when enabled so warm ones never need WordNet.
+    """
+    snapshot = _snapshot
+    if snapshot is not None:
+        data = snapshot.ancestors(word)
+        if data is not None:
+            return data
+    cache = _persistent_cache
+    if cache is not None:
+        data = cache.get_synsets(word)
+        if data is not None:
+            return tuple(data)
+    data = tuple(synset_ancestors(syn) for syn in cached_synsets(word))
+    if cache is not None:
+        cache.put_synsets(word, data)
+    return data
+
+class BucketSimilarityIndex:
+    """
+    WordNet similarity of a keyword against every bucket pattern in one pass.
+
+    Path similarity is 1 / (distance + 1), so the best bucket is simply the
+    first (bucket, pattern) in table order whose pattern is closest to the
+    keyword. That matches the old nested loop exactly: its early exit at a
+    similarity above 0.5 only fires on distance 0, which is also the minimum.
+
+    The index stores, for each ancestor synset, which pattern synsets sit
+    below it and how far. Scoring a keyword walks the keyword's own ancestors
+    once and relaxes the distance of every pattern sharing that ancestor, so
+    the per-call work no longer grows with buckets x patterns x synset pairs.
+    """
+
+    def __init__(self, table, model=None):
+        self.model = model if model is not None else BucketModel(table)
+        self.patterns = self.model.patterns
+        # (bucket id, pattern id) in table order
+        self.entries = list(zip(self.model.entry_buckets, self.model.entry_patterns))
+
+        # ancestor name -> [(depth, pattern index)], sorted by depth
+        self.postings = {}
+        # Smallest simulated-root depth per pattern, over all of its synsets
+        # and over the ones that need a root of their own (verbs, adjectives).
+        inf = float("inf")
+        self.root_any = [inf] * len(self.patterns)
+        self.root_needed = [inf] * len(self.patterns)
+        for pid, pat in enumerate(self.patterns):
+            for ancestors, root_depth, needs_root in word_ancestors(pat):
+                for name, depth in ancestors:
+                    self.postings.setdefault(name, []).append((depth, pid))
+                self.root_any[pid] = min(self.root_any[pid], root_depth)
+                if needs_root:
+                    self.root_needed[pid] = min(self.root_needed[pid], root_depth)
+        for plist in self.postings.values():
+            plist.sort()
+
+    def pattern_distances(self, keyword):
+        """
+        Returns a synset path distance from `keyword` to every pattern, or None
+        for patterns with no connecting path. Distances equal to the minimum
+        are exact; larger ones may be pruned to None or left as upper bounds,
+        since they can never decide the bucket.
+        """
+        inf = float("inf")
+        dist = [inf] * len(self.patterns)
+        best = inf
+        for ancestors, root_depth, needs_root in word_ancestors(keyword):
+            # Shallow ancestors first, so deeper ones can be pruned once they
+            # cannot beat (or tie) the best distance found so far.
+            for name, depth in ancestors:
+                if depth > best:
                     break
-        if best_sim > 0.5:
-            break
-    return best_bucket
+                for pdepth, pid in self.postings.get(name, ()):
+                    d = depth + pdepth
+                    if d > best:
+                        break
+                    if d < dist[pid]:
+                        dist[pid] = d
+                        best = min(best, d)
+            # The simulated root joins every pair in which either side needs it.
+            roots = self.root_any if needs_root else self.root_needed
+            for pid, pdepth in enumerate(roots):
+                d = root_depth + pdepth
+                if d < dist[pid]:
+                    dist[pid] = d
+                    best = min(best, d)
+        return [None if d == inf else d for d in dist]
 
-# ------------------ Generated Review Function ------------------
-def generate_review(activity_text):
+    def best_match_id(self, keyword):
+        """
+        Returns (bucket id, similarity) for the bucket the pairwise
+        word_similarity scan would pick, or (None, 0.0) when the keyword has
+        no WordNet path to any pattern.
+        """
+        dist = self.pattern_distances(keyword)
+        reachable = [d for d in dist if d is not None]
+        if not reachable:
+            return None, 0.0
+        nearest = min(reachable)
+        for bucket_id, pid in self.entries:
+            if dist[pid] == nearest:
+                return bucket_id, 1.0 / (nearest + 1)
+        return None, 0.0
+
+    def best_match(self, keyword):
+        """best_match_id() with the bucket as a name, "Other" when there is no path."""
+        bucket_id, similarity = self.best_match_id(keyword)
+        if bucket_id is None:
+            return "Other", 0.0
+        return self.model.buckets[bucket_id], similarity
+
+    def best_bucket(self, keyword):
+        """Bucket half of best_match()."""
+        return self.best_match(keyword)[0]
+
+_similarity_index = None
+
+def get_similarity_index():
+    """Builds the bucket similarity index from category_keywords on first use."""
+    global _similarity_index
+    if _similarity_index is None:
+        _similarity_index = BucketSimilarityIndex(category_keywords, get_bucket_model())
+    return _similarity_index
+
+# ------------------ Substring Fast Path ------------------
+_pattern_automaton = None
+
+def get_pattern_automaton():
     """
-    Dynamically builds a multi-paragraph review for a given activity
-    by selecting sentence fragments from dictionaries.
-    The review now also includes a description of what the place is about.
+    Compiles category_keywords into a multi-pattern automaton on first use.
+    Its "first" policy returns the first bucket in table order with any
+    pattern inside the keyword, like the per-pattern `in` checks it replaces.
+    """
+    global _pattern_automaton
+    if _pattern_automaton is None:
+        from bucket_automaton import PatternAutomaton
+
+        _pattern_automaton = PatternAutomaton(category_keywords, model=get_bucket_model())
+    return _pattern_automaton
+
+def find_buckets_in_text(text):
+    """Counts whole-word pattern hits per bucket in a review, in one pass over the text."""
+    return get_pattern_automaton().bucket_hits(text)
+
+# ------------------ N-gram Classifier Tier ------------------
+CLASSIFIER_MODES = ("wordnet", "hybrid", "ngram")
+# Centroids average a bucket's ~7 words, so even an exact match scores only
+# about 0.25-0.5. Calibrated on keywords that miss the substring check: of the
+# 195 words in generate_review's phrase tables (boilerplate in every review),
+# 21 reach 0.3 but only 1 reaches 0.4, while 4 misspellings/inflections of
+# each table pattern give 236 right and 12 wrong answers at 0.4. Misses
+# escalate to WordNet, so erring high only costs speed.
+DEFAULT_NGRAM_THRESHOLD = 0.4
+
+_classifier_mode = "wordnet"
+_ngram_threshold = DEFAULT_NGRAM_THRESHOLD
+_ngram_classifier = None
+
+def get_ngram_classifier():
+    """Builds the hashed n-gram classifier from category_keywords on first use (needs NumPy)."""
+    global _ngram_classifier
+    if _ngram_classifier is None:
+        from bucket_ngram import NgramBucketClassifier
+
+        _ngram_classifier = NgramBucketClassifier(category_keywords)
+    return _ngram_classifier
+
+def configure_classifier(mode=None, threshold=None):
+    """
+    Chooses how keywords without a substring hit are classified:
+
+    - "wordnet" (default): always the WordNet similarity index.
+    - "hybrid": the n-gram tier first, escalating to WordNet only when its
+      confidence is below `threshold`.
+    - "ngram": the n-gram tier only; WordNet is never loaded.
+
+    A warm-start snapshot built for another setting is turned off. Returns
+    the (mode, threshold) now in effect.
+    """
+    global _classifier_mode, _ngram_threshold
+    if mode is not None:
+        if mode not in CLASSIFIER_MODES:
+            raise ValueError(f"Unknown classifier mode {mode!r}; expected one of {CLASSIFIER_MODES}")
+        if mode != "wordnet":
+            get_ngram_classifier()
+        _classifier_mode = mode
+    if threshold is not None:
+        _ngram_threshold = float(threshold)
+    if _snapshot is not None:
+        try:
+            _snapshot.check(category_keywords, _classifier_mode, _ngram_threshold)
+        except ValueError:
+            disable_snapshot()
+    return _classifier_mode, _ngram_threshold
+
+# ------------------ Persistent Cache ------------------
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "overlap", "bucket_cache.sqlite3")
+
+_persistent_cache = None
+
+def enable_persistent_cache(path=DEFAULT_CACHE_PATH, max_entries=None):
+    """
+    Keeps WordNet fallback results and synset lookups in a SQLite file shared
+    by every process that enables the same path. Returns the cache object.
     """
-    # Sentence fragment dictionaries
-    service_phrases_positive = [
+    global _persistent_cache
+    from bucket_cache import DEFAULT_MAX_ENTRIES, PersistentBucketCache
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    disable_persistent_cache()
+    _persistent_cache = PersistentBucketCache(
+        path, category_keywords, max_entries=max_entries or DEFAULT_MAX_ENTRIES
+    )
+    return _persistent_cache
+
+def disable_persistent_cache():
+    global _persistent_cache
+    if _persistent_cache is not None:
+        _persistent_cache.close()
+        _persistent_cache = None
+    word_ancestors.cache_clear()
+
+def persistent_cache_stats():
+    """Hit/miss/eviction counters of the persistent cache, or None when it is off."""
+    return None if _persistent_cache is None else _persistent_cache.stats()
+
+# ------------------ Warm-start Snapshot ------------------
+_snapshot = None
+
+def enable_snapshot(path):
+    """
+    Answers keywords and pattern synsets recorded in a snapshot file (see
+    bucket_snapshot) without loading NLTK; anything else falls through to
+    the usual tiers. Raises ValueError if the snapshot was built for another
+    category table or classifier setting. Returns the snapshot.
+    """
+    global _snapshot
+    from bucket_snapshot import WarmSnapshot
+
+    snapshot = WarmSnapshot(path)
+    try:
+        snapshot.check(category_keywords, _classifier_mode, _ngram_threshold)
+    except ValueError:
+        snapshot.close()
+        raise
+    disable_snapshot()
+    _snapshot = snapshot
+    return snapshot
+
+def disable_snapshot():
+    global _snapshot
+    if _snapshot is not None:
+        _snapshot.close()
+        _snapshot = None
+    word_ancestors.cache_clear()
+
+# ------------------ Instrumentation ------------------
+# Stage timings are recorded by bucket_stats and cost next to nothing while
+# it is disabled. Stats are per process; pool workers keep their own.
+for _cached in (cached_synsets, synset_ancestors, word_ancestors):
+    bucket_stats.register_cache(_cached.__name__, _cached.cache_info)
+bucket_stats.register_cache("persistent", persistent_cache_stats)
+bucket_stats.register_cache(
+    "review_memo", lambda: None if _default_review_generator is None else _default_review_generator.memo_stats()
+)
+
+def enable_stats(enabled=True, dump_path=None, dump_interval=60.0):
+    """
+    Turns stage timing on or off. With dump_path, stats are also written
+    there as JSON every dump_interval seconds until stats are disabled.
+    """
+    bucket_stats.enable(enabled)
+    bucket_stats.stop_periodic_dump()
+    if enabled and dump_path:
+        bucket_stats.start_periodic_dump(dump_path, dump_interval)
+
+def get_stats():
+    """Per-stage latency histograms, counters and cache hit/miss/eviction stats."""
+    return bucket_stats.get_stats()
+
+# ------------------ Batch Classification ------------------
+# Below this many unique keywords the pool costs more than it saves.
+MIN_PARALLEL_KEYWORDS = 256
+
+def _worker_config():
+    """Settings a pool worker needs to classify exactly like this process."""
+    cache = _persistent_cache
+    return {
+        "cache_path": cache.path if cache is not None else None,
+        "cache_max_entries": cache.max_entries if cache is not None else None,
+        "mode": _classifier_mode,
+        "threshold": _ngram_threshold,
+        "snapshot_path": _snapshot.path if _snapshot is not None else None,
+    }
+
+def warm_up():
+    """
+    Builds the classifier tables the current mode needs (loading WordNet
+    unless the mode is "ngram"), so the first keyword does not pay for it.
+    """
+    get_pattern_automaton()
+    if _classifier_mode == "ngram":
+        get_ngram_classifier()
+    else:
+        get_similarity_index()
+
+def _warm_worker(config):
+    """Process pool initializer: load WordNet and build the index once per worker."""
+    cache_path = config["cache_path"]
+    if cache_path is not None and (_persistent_cache is None or _persistent_cache.path != cache_path):
+        enable_persistent_cache(cache_path, config["cache_max_entries"])
+    configure_classifier(config["mode"], config["threshold"])
+    snapshot_path = config["snapshot_path"]
+    if snapshot_path is not None and (_snapshot is None or _snapshot.path != snapshot_path):
+        enable_snapshot(snapshot_path)
+    warm_up()
+
+def _classify_chunk(keywords):
+    return [find_bucket_for_keyword(kw) for kw in keywords]
+
+def worker_pool(workers=None):
+    """
+    A process pool whose workers classify exactly like this process, warmed
+    up with WordNet and the similarity index before their first job. Pass it
+    to find_buckets_for_keywords to reuse it across calls.
+    """
+    # Imported here: multiprocessing would add tens of ms to importing the core.
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker, initargs=(_worker_config(),))
+
+def find_buckets_for_keywords(keywords, workers=None, chunk_size=None, executor=None):
+    """
+    Classifies many keywords at once and returns their buckets in input order,
+    exactly as repeated find_bucket_for_keyword calls would.
+
+    Duplicates are classified once. When there are enough unique keywords they
+    are sharded across a process pool of `workers` processes (default: one per
+    CPU), each warmed up with WordNet and the similarity index before its
+    first shard. The pool is `executor` when given (see worker_pool()) and a
+    new one for this call otherwise. workers=1 always runs serially in this
+    process.
+    """
+    keywords = list(keywords)
+    unique = list(dict.fromkeys(keywords))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(unique))
+
+    if workers <= 1 or len(unique) < MIN_PARALLEL_KEYWORDS:
+        buckets = _classify_chunk(unique)
+    else:
+        if chunk_size is None:
+            # A few shards per worker keeps the pool busy when some keywords
+            # fall through to WordNet and others hit the substring check.
+            chunk_size = max(1, -(-len(unique) // (workers * 4)))
+        chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+        buckets = []
+        if executor is not None:
+            for result in executor.map(_classify_chunk, chunks):
+                buckets.extend(result)
+        else:
+            with worker_pool(workers) as pool:
+                for result in pool.map(_classify_chunk, chunks):
+                    buckets.extend(result)
+
+    by_keyword = dict(zip(unique, buckets))
+    return [by_keyword[kw] for kw in keywords]
+
+# ------------------ Generated Reviews ------------------
+# Sentence fragments, keyed by sentiment where the wording depends on it.
+SENTIMENTS = ["positive", "neutral", "negative"]
+SENTIMENT_WEIGHTS = [0.5, 0.3, 0.2]
+
+SERVICE_PHRASES = {
+    "positive": [
         "The service was great.",
         "The staff was exceptionally friendly.",
         "I was impressed with the service.",
         "Everything from the welcome to the little details was spot on."
-    ]
-    service_phrases_negative = [
+    ],
+    "negative": [
         "The service was disappointing.",
         "The staff seemed indifferent and inattentive.",
         "I encountered poor service throughout my visit.",
         "Service left much to be desired."
-    ]
-    service_phrases_neutral = [
+    ],
+    "neutral": [
         "The service was okay.",
         "Service was average—nothing extraordinary.",
         "I found the service to be just fine.",
         "Service met my basic expectations."
-    ]
-    
-    experience_phrases_positive = [
+    ],
+}
+
+EXPERIENCE_PHRASES = {
+    "positive": [
         "You know, when I'm on the road, I always seek out the local gems, and this spot did not disappoint.",
         "I'm the kind of person who loves discovering local favorites—and this one truly impressed me.",
         "Whenever I travel, I make it a point to try the signature drink at a new place, and it was simply amazing.",
         "This venue quickly became one of my cherished finds."
-    ]
-    experience_phrases_negative = [
+    ],
+    "negative": [
         "When I'm traveling, I expect consistency, and sadly, this place did not deliver.",
         "I've had better experiences elsewhere, and this one was more of a miss than a hit.",
         "It left me underwhelmed, and I certainly won't be rushing back.",
         "The visit was a mixed bag that unfortunately leaned toward disappointment."
-    ]
-    experience_phrases_neutral = [
+    ],
+    "neutral": [
         "I often check out local spots while traveling, and this one was just average.",
         "It was a standard outing—nothing too memorable, but not terrible either.",
         "The experience was as expected, neither outstanding nor disappointing.",
         "It met my basic expectations for a quick stop."
-    ]
-    
-    detail_templates = [
-        "The atmosphere was {adj_atmosphere} and {adj_detail}, enhanced by {location_desc}.",
-        "I was captivated by a {adj_detail} vibe, especially with {location_desc} in the background.",
-        "The setting boasted a {adj_detail} charm, thanks in part to {location_desc}.",
-        "It had a unique feel—{adj_atmosphere} yet {adj_detail}—with {location_desc} adding to the allure."
-    ]
-    adj_detail_list = ["vibrant", "cozy", "dynamic", "intimate", "rustic", "modern"]
-    adj_atmosphere_list = ["lively", "tranquil", "energetic", "calming"]
-    location_descriptors = [
-        "a bustling downtown scene",
-        "a quiet suburban nook",
-        "the charm of a historic neighborhood",
-        "a scenic urban backdrop",
-        "a delightful local corner"
-    ]
-    
-    closing_phrases_positive = [
+    ],
+}
+
+DETAIL_TEMPLATES = [
+    "The atmosphere was {adj_atmosphere} and {adj_detail}, enhanced by {location_desc}.",
+    "I was captivated by a {adj_detail} vibe, especially with {location_desc} in the background.",
+    "The setting boasted a {adj_detail} charm, thanks in part to {location_desc}.",
+    "It had a unique feel—{adj_atmosphere} yet {adj_detail}—with {location_desc} adding to the allure."
+]
+ADJ_DETAIL_LIST = ["vibrant", "cozy", "dynamic", "intimate", "rustic", "modern"]
+ADJ_ATMOSPHERE_LIST = ["lively", "tranquil", "energetic", "calming"]
+LOCATION_DESCRIPTORS = [
+    "a bustling downtown scene",
+    "a quiet suburban nook",
+    "the charm of a historic neighborhood",
+    "a scenic urban backdrop",
+    "a delightful local corner"
+]
+
+CLOSING_PHRASES = {
+    "positive": [
         "I would highly recommend checking it out!",
         "I'll definitely be back soon.",
         "This place quickly earned a top spot on my list.",
         "It left quite an impression and I'm eager to return."
-    ]
-    closing_phrases_negative = [
+    ],
+    "negative": [
         "Overall, the experience left much to be desired.",
         "I doubt I'll be returning anytime soon.",
         "It simply didn't live up to my expectations.",
         "I wouldn't recommend it based on my visits."
-    ]
-    closing_phrases_neutral = [
+    ],
+    "neutral": [
         "It was an average experience that met my expectations.",
         "I remain indifferent—nothing stood out particularly.",
         "It did the job, but I wouldn't go out of my way to return.",
         "It was a standard outing overall."
-    ]
-    
-    multi_day_issue = (
-        "During my visits, inconsistencies became apparent—one day the drink was decent, "
-        "but on another, simple requests like 'no whipped cream' were completely ignored."
-    )
-    
-    sentiment = random.choices(
-        ["positive", "neutral", "negative"],
-        weights=[0.5, 0.3, 0.2]
-    )[0]
-    
-    # Determine bucket based on activity text using our improved matching
-    bucket = find_bucket_for_keyword(activity_text)
-    
-    # Use a simple description for the bucket
-    category_desc = f"a place known for its {bucket.lower()}"
-    
-    if sentiment == "positive":
-        service_sentence = random.choice(service_phrases_positive)
-        experience_sentence = random.choice(experience_phrases_positive)
-    elif sentiment == "negative":
-        service_sentence = random.choice(service_phrases_negative)
-        experience_sentence = random.choice(experience_phrases_negative)
-    else:
-        service_sentence = random.choice(service_phrases_neutral)
-        experience_sentence = random.choice(experience_phrases_neutral)
-    
-    paragraph1 = f"I recently visited '{activity_text}', {category_desc}. {service_sentence} {experience_sentence}"
-    
-    detail_template = random.choice(detail_templates)
-    detail_sentence = detail_template.format(
-        adj_atmosphere=random.choice(adj_atmosphere_list),
-        adj_detail=random.choice(adj_detail_list),
-        location_desc=random.choice(location_descriptors)
-    )
-    if sentiment == "negative":
-        paragraph2 = f"{detail_sentence} {multi_day_issue}"
-    else:
-        paragraph2 = detail_sentence
-    
-    if sentiment == "positive":
-        closing_sentence = random.choice(closing_phrases_positive)
-    elif sentiment == "negative":
-        closing_sentence = random.choice(closing_phrases_negative)
-    else:
-        closing_sentence = random.choice(closing_phrases_neutral)
-    paragraph3 = closing_sentence
-    
-    review = "\n\n".join([paragraph1, paragraph2, paragraph3])
-    return review
+    ],
+}
 
-# ----------------------- GUI Setup -----------------------
-root = tk.Tk()
-root.title("Activity Recommendation with NLTK Keyword Extraction")
-root.geometry("1000x650")
-
-style = ttk.Style()
-style.theme_use("clam")
-
-main_frame = ttk.Frame(root, padding="10")
-main_frame.grid(row=0, column=0, sticky="nsew")
-root.columnconfigure(0, weight=1)
-root.rowconfigure(0, weight=1)
-main_frame.columnconfigure(0, weight=1)
-main_frame.columnconfigure(1, weight=2)
-main_frame.rowconfigure(0, weight=1)
-
-# Left frame: List of activities
-left_frame = ttk.Frame(main_frame)
-left_frame.grid(row=0, column=0, sticky="nsew", padx=(0,10))
-activities_label = ttk.Label(left_frame, text="Activities", font=("Helvetica", 14, "bold"))
-activities_label.pack(anchor="w")
-activity_listbox = tk.Listbox(left_frame, height=20, font=("Helvetica", 12))
-activity_listbox.pack(side="left", fill="both", expand=True, pady=5)
-list_scrollbar = ttk.Scrollbar(left_frame, orient="vertical", command=activity_listbox.yview)
-list_scrollbar.pack(side="right", fill="y")
-activity_listbox.configure(yscrollcommand=list_scrollbar.set)
-for act in activities:
-    activity_listbox.insert(tk.END, act)
-
-# Right frame: Activity details and review display
-right_frame = ttk.Frame(main_frame, relief="sunken", padding="10")
-right_frame.grid(row=0, column=1, sticky="nsew")
-details_label = ttk.Label(right_frame, text="Activity Details", font=("Helvetica", 14, "bold"))
-details_label.pack(anchor="w")
-
-details_text = tk.Text(right_frame, wrap="word", font=("Helvetica", 12), height=8)
-details_text.pack(fill="both", expand=True, pady=5)
-details_text.config(state="disabled")
-
-review_label = ttk.Label(right_frame, text="Generated Review for the Activity:", font=("Helvetica", 12))
-review_label.pack(anchor="w", pady=(10,0))
-review_text = tk.Text(right_frame, wrap="word", font=("Helvetica", 12), height=4)
-review_text.pack(fill="both", expand=True, pady=5)
-
-button_frame = ttk.Frame(right_frame)
-button_frame.pack(fill="x", pady=5)
-like_button = ttk.Button(button_frame, text="Like Activity", command=lambda: on_like_activity())
-like_button.pack(side="left", padx=(0, 10))
-dislike_button = ttk.Button(button_frame, text="Dislike Activity", command=lambda: on_dislike_activity())
-dislike_button.pack(side="left")
-
-liked_buckets_label = ttk.Label(right_frame, text="Liked Buckets:", font=("Helvetica", 12, "bold"))
-liked_buckets_label.pack(anchor="w", pady=(10,0))
-liked_buckets_display = ttk.Label(right_frame, text="", font=("Helvetica", 12))
-liked_buckets_display.pack(anchor="w")
-
-# ----------------------- Event Handling -----------------------
-def on_activity_select(event):
-    """Update details panel and generate a review when an activity is selected."""
-    selection = event.widget.curselection()
-    if selection:
-        index = selection[0]
-        activity_text = event.widget.get(index)
-        details_text.config(state="normal")
-        details_text.delete("1.0", tk.END)
-        details_text.insert(tk.END, f"Activity: {activity_text}\n")
-        details_text.config(state="disabled")
-        review = generate_review(activity_text)
-        review_text.delete("1.0", tk.END)
-        review_text.insert(tk.END, review)
-
-activity_listbox.bind("<<ListboxSelect>>", on_activity_select)
-
-def on_like_activity():
-    """Extract keywords from the generated review and add them to liked buckets if the activity is liked."""
-    review = review_text.get("1.0", tk.END).strip()
-    if review:
-        keywords = extract_keywords_nltk(review)
-        for kw in keywords:
-            bucket = find_bucket_for_keyword(kw)
-            if bucket in liked_buckets:
-                if kw not in liked_buckets[bucket]:
-                    liked_buckets[bucket].append(kw)
-            else:
-                liked_buckets[bucket] = [kw]
-        liked_text = ""
-        for bucket, kw_list in liked_buckets.items():
-            liked_text += f"{bucket}: {', '.join(kw_list)}\n"
-        liked_buckets_display.config(text=liked_text)
-    else:
-        liked_buckets_display.config(text="No review text available to extract keywords.")
-
-def on_dislike_activity():
-    """Handle activity dislike: no keywords are stored."""
-    liked_buckets_display.config(text="Activity disliked. No keywords added.")
-
-# Pre-populate liked buckets for the first 50 activities
-for activity in activities[:50]:
-    review = generate_review(activity)
-    keywords = extract_keywords_nltk(review)
-    for kw in keywords:
-        bucket = find_bucket_for_keyword(kw)
-        if bucket in liked_buckets:
-            if kw not in liked_buckets[bucket]:
-                liked_buckets[bucket].append(kw)
+MULTI_DAY_ISSUE = (
+    "During my visits, inconsistencies became apparent—one day the drink was decent, "
+    "but on another, simple requests like 'no whipped cream' were completely ignored."
+)
+
+class ReviewGenerator:
+    """
+    Builds multi-paragraph reviews for activities from the phrase tables above.
+
+    Every detail sentence (template x atmosphere x detail x location) is
+    formatted once up front, each activity's bucket is looked up once, and
+    all randomness comes from `rng`. Pass a seed, or a random.Random, for
+    reproducible output; the draws are made in the same order as the
+    original generate_review, so equal RNG states give equal reviews.
+    """
+
+    def __init__(self, seed=None, rng=None, classify=None):
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.classify = classify or find_bucket_for_keyword
+        self._bucket_memo = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+        # detail sentence for (template, atmosphere, detail, location) indexes
+        self._details = [
+            [
+                [
+                    [
+                        template.format(adj_atmosphere=atmosphere, adj_detail=detail, location_desc=location)
+                        for location in LOCATION_DESCRIPTORS
+                    ]
+                    for detail in ADJ_DETAIL_LIST
+                ]
+                for atmosphere in ADJ_ATMOSPHERE_LIST
+            ]
+            for template in DETAIL_TEMPLATES
+        ]
+
+    def category_desc(self, activity_text):
+        """A simple description of the activity's bucket, memoized per activity."""
+        desc = self._bucket_memo.get(activity_text)
+        if desc is not None:
+            self.memo_hits += 1
+        else:
+            self.memo_misses += 1
+            t0 = bucket_stats.start()
+            bucket = self.classify(activity_text)
+            desc = self._bucket_memo[activity_text] = f"a place known for its {bucket.lower()}"
+            bucket_stats.lap("generate.classify", t0)
+        return desc
+
+    def memo_stats(self):
+        lookups = self.memo_hits + self.memo_misses
+        return {
+            "hits": self.memo_hits,
+            "misses": self.memo_misses,
+            "size": len(self._bucket_memo),
+            "hit_rate": round(self.memo_hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _assemble(self, activity_text, sentiment, service_sentence, experience_sentence, detail_sentence, closing_sentence):
+        paragraph1 = f"I recently visited '{activity_text}', {self.category_desc(activity_text)}. {service_sentence} {experience_sentence}"
+        if sentiment == "negative":
+            paragraph2 = f"{detail_sentence} {MULTI_DAY_ISSUE}"
         else:
-            liked_buckets[bucket] = [kw]
+            paragraph2 = detail_sentence
+        return "\n\n".join([paragraph1, paragraph2, closing_sentence])
 
-liked_text = ""
-for bucket, kw_list in liked_buckets.items():
-    liked_text += f"{bucket}: {', '.join(kw_list)}\n"
-liked_buckets_display.config(text=liked_text)
+    def generate(self, activity_text):
+        """Generates one review for the activity."""
+        choice = self.rng.choice
+        sentiment = self.rng.choices(SENTIMENTS, weights=SENTIMENT_WEIGHTS)[0]
+        service_sentence = choice(SERVICE_PHRASES[sentiment])
+        experience_sentence = choice(EXPERIENCE_PHRASES[sentiment])
+        template = choice(range(len(DETAIL_TEMPLATES)))
+        atmosphere = choice(range(len(ADJ_ATMOSPHERE_LIST)))
+        detail = choice(range(len(ADJ_DETAIL_LIST)))
+        location = choice(range(len(LOCATION_DESCRIPTORS)))
+        closing_sentence = choice(CLOSING_PHRASES[sentiment])
+        return self._assemble(
+            activity_text,
+            sentiment,
+            service_sentence,
+            experience_sentence,
+            self._details[template][atmosphere][detail][location],
+            closing_sentence,
+        )
 
-root.mainloop()
+    def generate_many(self, activities, n, block_size=4096):
+        """
+        Yields (activity, review) for `n` reviews, cycling through `activities`
+        in order. Randomness is drawn a block at a time, one call per sentence
+        slot instead of one per review, so only a block of draws is held in
+        memory. The stream is reproducible for a given seed but differs from
+        calling generate() n times.
+        """
+        activities = list(activities)
+        if not activities:
+            return
+        rng = self.rng
+        n_templates, n_atmospheres = len(DETAIL_TEMPLATES), len(ADJ_ATMOSPHERE_LIST)
+        n_details, n_locations = len(ADJ_DETAIL_LIST), len(LOCATION_DESCRIPTORS)
+        produced = 0
+        while produced < n:
+            m = min(block_size, n - produced)
+            sentiments = rng.choices(SENTIMENTS, weights=SENTIMENT_WEIGHTS, k=m)
+            # Uniform draws scaled per slot, since phrase list lengths vary by sentiment.
+            u_service, u_experience, u_closing = (
+                [rng.random() for _ in range(m)] for _ in range(3)
+            )
+            templates = rng.choices(range(n_templates), k=m)
+            atmospheres = rng.choices(range(n_atmospheres), k=m)
+            details = rng.choices(range(n_details), k=m)
+            locations = rng.choices(range(n_locations), k=m)
+            for i in range(m):
+                sentiment = sentiments[i]
+                service = SERVICE_PHRASES[sentiment]
+                experience = EXPERIENCE_PHRASES[sentiment]
+                closing = CLOSING_PHRASES[sentiment]
+                activity_text = activities[(produced + i) % len(activities)]
+                yield activity_text, self._assemble(
+                    activity_text,
+                    sentiment,
+                    service[int(u_service[i] * len(service))],
+                    experience[int(u_experience[i] * len(experience))],
+                    self._details[templates[i]][atmospheres[i]][details[i]][locations[i]],
+                    closing[int(u_closing[i] * len(closing))],
+                )
+            produced += m
+
+_default_review_generator = None
+
+def generate_review(activity_text):
+    """
+    Dynamically builds a multi-paragraph review for a given activity
+    by selecting sentence fragments from dictionaries.
+    The review now also includes a description of what the place is about.
+    Draws from the global `random` module; use ReviewGenerator for seeded output.
+    """
+    global _default_review_generator
+    if _default_review_generator is None:
+        _default_review_generator = ReviewGenerator(rng=random)
+    t0 = bucket_stats.start()
+    review = _default_review_generator.generate(activity_text)
+    bucket_stats.lap("generate.review", t0)
+    return review
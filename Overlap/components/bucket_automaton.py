@@ -0,0 +1,130 @@
+"""
+Aho-Corasick matcher over the category_keywords patterns.
+
+The automaton is compiled once and then finds every pattern occurrence in a
+single left-to-right scan, no matter how many patterns the table holds. It
+serves both single keywords (the fast path of find_bucket_for_keyword) and
+whole review texts.
+
+When several patterns hit, one of two tie-break policies picks the bucket:
+
+- "first":   the bucket that comes first in category_keywords. This is what
+             the old `pat in keyword.lower()` loop returned, and it is the
+             default.
+- "longest": the bucket of the longest matching pattern, with ties going to
+             the earlier bucket, so "virtual reality arcade" lands in
+             "VR Gaming Center" rather than "Gaming Arcade".
+"""
+from collections import deque
+
+from bucket_model import BucketModel
+
+POLICIES = ("first", "longest")
+
+
+class PatternAutomaton:
+    """Multi-pattern substring matcher that maps pattern hits to buckets."""
+
+    def __init__(self, table, policy="first", model=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown tie-break policy {policy!r}; expected one of {POLICIES}")
+        self.policy = policy
+        self.model = model if model is not None else BucketModel(table)
+        self.buckets = self.model.buckets
+        # Pattern ids are the model's; matching is case-insensitive.
+        self.patterns = [pat.lower() for pat in self.model.patterns]
+        # pattern id -> ids of every bucket listing it, in table order
+        self.pattern_buckets = [self.model.buckets_of(pid) for pid in range(len(self.patterns))]
+
+        # Per-pattern rank under the active policy; lower wins.
+        self.rank = [
+            (buckets[0],) if policy == "first" else (-len(pat), buckets[0])
+            for pat, buckets in zip(self.patterns, self.pattern_buckets)
+        ]
+        self._build()
+
+    def _build(self):
+        goto = [{}]
+        outputs = [[]]
+        for pid, pat in enumerate(self.patterns):
+            state = 0
+            for ch in pat:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(pid)
+
+        # Breadth-first failure links; each state inherits the outputs of its
+        # failure state so a scan never has to walk the failure chain.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt].extend(outputs[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(out) for out in outputs]
+
+    def find_all(self, text):
+        """Yields (start, end, pattern) for every pattern occurrence in lowercased text."""
+        goto, fail, outputs, patterns = self._goto, self._fail, self._outputs, self.patterns
+        state = 0
+        for pos, ch in enumerate(text.lower()):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in outputs[state]:
+                yield pos + 1 - len(patterns[pid]), pos + 1, pid
+
+    def _hits(self, text, whole_words):
+        if not whole_words:
+            return self.find_all(text)
+        lowered = text.lower()
+        return (
+            (start, end, pid)
+            for start, end, pid in self.find_all(lowered)
+            if (start == 0 or not lowered[start - 1].isalnum())
+            and (end == len(lowered) or not lowered[end].isalnum())
+        )
+
+    def best_bucket_id(self, text, whole_words=False):
+        """
+        Returns the id of the bucket chosen by the tie-break policy among all
+        pattern hits in text, or None when nothing matches.
+        """
+        best = None
+        for _, _, pid in self._hits(text, whole_words):
+            if best is None or self.rank[pid] < self.rank[best]:
+                best = pid
+        if best is None:
+            return None
+        return self.pattern_buckets[best][0]
+
+    def best_bucket(self, text, whole_words=False):
+        """Name of the best_bucket_id() bucket, or None when nothing matches."""
+        bid = self.best_bucket_id(text, whole_words)
+        return None if bid is None else self.buckets[bid]
+
+    def bucket_hits(self, text, whole_words=True):
+        """
+        Counts, for each bucket, how many pattern occurrences in text belong
+        to it. A pattern listed under several buckets counts for all of them.
+        By default only whole-word hits count, since "art" inside "start" is
+        noise in running text. Buckets come back in table order.
+        """
+        counts = [0] * len(self.buckets)
+        for _, _, pid in self._hits(text, whole_words):
+            for bucket_idx in self.pattern_buckets[pid]:
+                counts[bucket_idx] += 1
+        return {self.buckets[i]: n for i, n in enumerate(counts) if n}
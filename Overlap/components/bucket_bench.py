@@ -0,0 +1,307 @@
+"""
+Reproducible benchmarks for the bucket classifier and review generator.
+
+Every workload is generated from a seeded RNG and the real category_keywords
+table, and runs offline against the locally installed NLTK data. Results
+are written as JSON with stable keys, so two runs can be diffed directly or
+compared with --compare:
+
+    python bucket_bench.py --sizes 100,10000,1000000 -o bench.json
+    python bucket_bench.py --compare old.json new.json
+    python bucket_bench.py --verify 500
+
+Workloads:
+
+- substring:  find_bucket_for_keyword on activity names that contain a
+              category pattern (automaton fast path)
+- wordnet:    find_bucket_for_keyword on WordNet nouns with no pattern
+              substring (similarity-index fallback)
+- oov:        find_bucket_for_keyword on made-up words (no synsets)
+- similarity: word_similarity between WordNet nouns and table patterns
+- extract:    extract_keywords_nltk on generated reviews
+- extract_fast: extract_keywords_fast (bucket_extract) on the same reviews
+- generate:   generate_review on synthetic activity names
+
+--verify checks that the similarity index still picks the bucket and
+similarity of the original pairwise word_similarity scan, over every table
+pattern plus a seeded sample of WordNet nouns. The index relies on private
+Synset methods, so run it after upgrading NLTK; it exits non-zero on any
+mismatch.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from functools import lru_cache
+
+import bucket
+
+DEFAULT_SIZES = (100, 1000, 10000)
+WORKLOADS = ("substring", "wordnet", "oov", "similarity", "extract", "extract_fast", "generate")
+
+_NAME_PREFIXES = ["Urban", "Golden", "Sunset", "Riverside", "Downtown", "Cozy", "Summit", "Zen", "Retro", "Blue"]
+_NAME_SUFFIXES = ["Hub", "House", "Place", "Corner", "Lounge", "Spot", "Works", "Collective"]
+
+
+# ------------------ Synthetic Workloads ------------------
+def synthetic_activities(n, rng):
+    """Activity names built around a random category pattern, e.g. "Zen Sushi Spot"."""
+    patterns = [pat for pats in bucket.category_keywords.values() for pat in pats]
+    return [
+        f"{rng.choice(_NAME_PREFIXES)} {rng.choice(patterns).title()} {rng.choice(_NAME_SUFFIXES)}"
+        for _ in range(n)
+    ]
+
+
+def _no_pattern_hit(word):
+    return bucket.get_pattern_automaton().best_bucket(word) is None
+
+
+@lru_cache(maxsize=None)
+def wordnet_vocabulary():
+    """Single-word WordNet nouns that miss the substring check, in a stable order."""
+    wordnet = bucket.load_nltk().corpus.wordnet
+    return tuple(sorted(w for w in wordnet.all_lemma_names("n") if w.isalpha() and _no_pattern_hit(w)))
+
+
+def oov_words(n, rng):
+    """Pronounceable nonsense words with no pattern substring and no synsets."""
+    consonants, vowels = "bdfgklmnpqrstvwxz", "aeiou"
+    words = []
+    while len(words) < n:
+        word = "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(3, 5))) + "x"
+        if _no_pattern_hit(word):
+            words.append(word)
+    return words
+
+
+def build_workload(name, size, seed):
+    """Returns (function, list of single-argument inputs) for one workload."""
+    rng = random.Random(f"{seed}:{name}:{size}")
+    if name == "substring":
+        return bucket.find_bucket_for_keyword, synthetic_activities(size, rng)
+    if name == "wordnet":
+        vocab = wordnet_vocabulary()
+        return bucket.find_bucket_for_keyword, [rng.choice(vocab) for _ in range(size)]
+    if name == "oov":
+        return bucket.find_bucket_for_keyword, oov_words(size, rng)
+    if name == "similarity":
+        vocab = wordnet_vocabulary()
+        patterns = [pat for pats in bucket.category_keywords.values() for pat in pats]
+        pairs = [(rng.choice(vocab), rng.choice(patterns)) for _ in range(size)]
+        return (lambda pair: bucket.word_similarity(*pair)), pairs
+    if name in ("extract", "extract_fast"):
+        # generate_review draws from the global random module; both extract
+        # workloads seed it alike so they time the same reviews.
+        rng = random.Random(f"{seed}:extract:{size}")
+        random.seed(f"{seed}:reviews:{size}")
+        reviews = [bucket.generate_review(act) for act in synthetic_activities(size, rng)]
+        if name == "extract_fast":
+            from bucket_extract import extract_keywords_fast
+
+            return extract_keywords_fast, reviews
+        return bucket.extract_keywords_nltk, reviews
+    if name == "generate":
+        random.seed(f"{seed}:generate:{size}")
+        return bucket.generate_review, synthetic_activities(size, rng)
+    raise ValueError(f"Unknown workload {name!r}; expected one of {WORKLOADS}")
+
+
+# ------------------ Verification ------------------
+def pairwise_best_match(keyword):
+    """(bucket, similarity) from the original scan over every table pattern."""
+    best_bucket, best_sim = "Other", 0.0
+    for bucket_name, patterns in bucket.category_keywords.items():
+        for pat in patterns:
+            sim = bucket.word_similarity(keyword, pat)
+            if sim > best_sim:
+                best_sim, best_bucket = sim, bucket_name
+                if best_sim > 0.5:
+                    return best_bucket, best_sim
+    return best_bucket, best_sim
+
+
+def verify(size, seed):
+    """
+    Compares get_similarity_index().best_match() with pairwise_best_match()
+    on the table patterns and `size` sampled WordNet nouns.
+    """
+    vocab = wordnet_vocabulary()
+    words = list(bucket.get_bucket_model().patterns)
+    words += random.Random(f"{seed}:verify").sample(vocab, min(size, len(vocab)))
+    index = bucket.get_similarity_index()
+    mismatches = []
+    for word in words:
+        expected = pairwise_best_match(word)
+        got = index.best_match(word)
+        if got[0] != expected[0] or not math.isclose(got[1], expected[1]):
+            mismatches.append({"word": word, "expected": list(expected), "got": list(got)})
+    return {"nltk": bucket.load_nltk().__version__, "words": len(words), "mismatches": mismatches}
+
+
+# ------------------ Measurement ------------------
+_CACHED_FUNCTIONS = ("cached_synsets", "synset_ancestors", "word_ancestors")
+
+
+def reset_caches():
+    """
+    Drops in-process memo tables so every workload starts equally cold. The
+    automaton and similarity index are built once up front and kept, since
+    their one-off build cost would otherwise land in a single latency sample.
+    """
+    for fname in _CACHED_FUNCTIONS:
+        getattr(bucket, fname).cache_clear()
+    # generate_review's generator memoizes a bucket per activity name.
+    bucket._default_review_generator = None
+    extract = sys.modules.get("bucket_extract")
+    if extract is not None:
+        # A fresh extractor drops the POS memo but keeps the loaded tagger.
+        extract._fast_extractor = None
+
+
+def cache_stats():
+    stats = {}
+    for fname in _CACHED_FUNCTIONS:
+        info = getattr(bucket, fname).cache_info()
+        lookups = info.hits + info.misses
+        stats[fname] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+    persistent = bucket.persistent_cache_stats()
+    if persistent is not None:
+        stats["persistent"] = persistent
+    if bucket._default_review_generator is not None:
+        stats["review_memo"] = bucket._default_review_generator.memo_stats()
+    return stats
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_workload(name, size, seed, measure_memory=True):
+    func, inputs = build_workload(name, size, seed)
+
+    reset_caches()
+    latencies = array("q")
+    clock = time.perf_counter_ns
+    start = clock()
+    for item in inputs:
+        t0 = clock()
+        func(item)
+        latencies.append(clock() - t0)
+    elapsed = (clock() - start) / 1e9
+    caches = cache_stats()
+
+    peak_kb = None
+    if measure_memory:
+        # A second, traced pass: tracemalloc slows execution down, so it is
+        # kept out of the timed run.
+        reset_caches()
+        tracemalloc.start()
+        for item in inputs:
+            func(item)
+        peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "workload": name,
+        "size": size,
+        "seconds": round(elapsed, 6),
+        "throughput_per_s": round(size / elapsed, 2) if elapsed else None,
+        "p50_us": round(percentile(ordered, 0.50) / 1000, 3),
+        "p99_us": round(percentile(ordered, 0.99) / 1000, 3),
+        "peak_memory_kb": peak_kb,
+        "caches": caches,
+    }
+
+
+def run(workloads, sizes, seed, measure_memory=True):
+    bucket.ensure_nltk_data(download=False)
+    nltk = bucket.load_nltk()
+    bucket.get_pattern_automaton()
+    bucket.get_similarity_index()
+    from bucket_cache import table_hash
+
+    results = []
+    for name in workloads:
+        for size in sizes:
+            results.append(run_workload(name, size, seed, measure_memory))
+            print(f"{name:>10} {size:>9}: {results[-1]['throughput_per_s']} ops/s", file=sys.stderr)
+    return {
+        "meta": {
+            "seed": seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "nltk": nltk.__version__,
+            "category_table": table_hash(bucket.category_keywords),
+        },
+        "results": results,
+    }
+
+
+def compare(old, new):
+    """Prints throughput and latency ratios (new / old) for matching workloads."""
+    previous = {(r["workload"], r["size"]): r for r in old["results"]}
+    print(f"{'workload':>10} {'size':>9} {'throughput':>11} {'p50':>8} {'p99':>8}")
+    for r in new["results"]:
+        o = previous.get((r["workload"], r["size"]))
+        if o is None:
+            continue
+
+        def ratio(key):
+            return f"{r[key] / o[key]:.2f}x" if o[key] else "n/a"
+
+        print(f"{r['workload']:>10} {r['size']:>9} {ratio('throughput_per_s'):>11} {ratio('p50_us'):>8} {ratio('p99_us'):>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the bucket classifier.")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated subset of: " + ", ".join(WORKLOADS))
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated input counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--verify", type=int, metavar="N", help="check the similarity index against the pairwise scan on N sampled nouns and exit")
+    args = parser.parse_args(argv)
+
+    if args.verify is not None:
+        report = verify(args.verify, args.seed)
+        print(json.dumps(report, indent=2, sort_keys=True))
+        if report["mismatches"]:
+            sys.exit(1)
+        return
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            compare(json.load(f_old), json.load(f_new))
+        return
+
+    report = run(
+        [w.strip() for w in args.workloads.split(",") if w.strip()],
+        [int(s) for s in args.sizes.split(",") if s.strip()],
+        args.seed,
+        measure_memory=not args.no_memory,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Persistent keyword -> bucket and word -> synset-ancestor cache.
+
+Results live in a local SQLite file so they survive restarts and can be
+shared by every worker process on the machine. Writes go through WAL mode
+with a busy timeout, so concurrent readers never block each other and
+concurrent writers wait their turn instead of failing. A hit only writes
+when its row's last_used is more than TOUCH_INTERVAL_NS old, so a hot
+keyword is read without taking the write lock.
+
+Bucket rows are keyed by a hash of category_keywords, so editing the table
+invalidates them automatically. Synset rows only depend on WordNet and are
+kept across table changes.
+
+Eviction is scheduled from a write counter stored in the file itself, so
+the size bound holds across every process sharing it, including short
+runs that each write only a few rows.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA_VERSION = 1
+DEFAULT_MAX_ENTRIES = 200_000
+TABLES = ("buckets", "synsets")
+# Eviction needs a COUNT(*), so it only runs every this many writes to a
+# table, counted across all processes.
+EVICT_EVERY = 256
+# LRU order is kept to this resolution; fresher hits skip the UPDATE.
+TOUCH_INTERVAL_NS = 60 * 10**9
+
+
+def table_hash(table):
+    """Stable hash of a bucket table; order matters because it breaks ties."""
+    payload = json.dumps([SCHEMA_VERSION, list(table.items())], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PersistentBucketCache:
+    """
+    Size-bounded LRU cache of classifier results in a SQLite file.
+
+    Each of the two tables (buckets and synsets) is trimmed back to
+    `max_entries` rows when the cache is opened and after every EVICT_EVERY
+    writes to it, least recently used rows first. Hit, miss and eviction
+    counters are per process and per table, and reported by stats().
+    """
+
+    def __init__(self, path, table, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.table_hash = table_hash(table)
+        self.hits = dict.fromkeys(TABLES, 0)
+        self.misses = dict.fromkeys(TABLES, 0)
+        self.evictions = dict.fromkeys(TABLES, 0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " table_hash TEXT NOT NULL, keyword TEXT NOT NULL, bucket TEXT NOT NULL,"
+                " last_used INTEGER NOT NULL, PRIMARY KEY (table_hash, keyword))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS synsets ("
+                " word TEXT PRIMARY KEY, data TEXT NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_lru ON buckets (last_used)")
+            conn.execute("CREATE INDEX IF NOT EXISTS synsets_lru ON synsets (last_used)")
+            # Writes per table by every process, to schedule eviction.
+            conn.execute("CREATE TABLE IF NOT EXISTS writes (name TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+            conn.executemany("INSERT OR IGNORE INTO writes (name, count) VALUES (?, 0)", [(t,) for t in TABLES])
+            # Rows from any other version of category_keywords can never hit again.
+            conn.execute("DELETE FROM buckets WHERE table_hash != ?", (self.table_hash,))
+        for table in TABLES:
+            self.evict(table)
+
+    def _connect(self):
+        """One connection per thread and per process; sqlite handles must not cross a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ------------------ Keyword -> bucket ------------------
+    def get_bucket(self, keyword):
+        """Returns the cached bucket for keyword, or None on a miss."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT bucket, last_used FROM buckets WHERE table_hash = ? AND keyword = ?",
+            (self.table_hash, keyword),
+        ).fetchone()
+        if row is None:
+            self._count("buckets", miss=True)
+            return None
+        self._count("buckets", miss=False)
+        now = time.time_ns()
+        if now - row[1] > TOUCH_INTERVAL_NS:
+            with conn:
+                conn.execute(
+                    "UPDATE buckets SET last_used = ? WHERE table_hash = ? AND keyword = ?",
+                    (now, self.table_hash, keyword),
+                )
+        return row[0]
+
+    def put_bucket(self, keyword, bucket):
+        self._write(
+            "buckets",
+            "INSERT OR REPLACE INTO buckets (table_hash, keyword, bucket, last_used) VALUES (?, ?, ?, ?)",
+            (self.table_hash, keyword, bucket, time.time_ns()),
+        )
+
+    # ------------------ Word -> synset ancestors ------------------
+    def get_synsets(self, word):
+        """
+        Returns the cached synset_ancestors() tuples for every synset of word,
+        or None on a miss.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT data, last_used FROM synsets WHERE word = ?", (word,)).fetchone()
+        if row is None:
+            self._count("synsets", miss=True)
+            return None
+        self._count("synsets", miss=False)
+        now = time.time_ns()
+        if now - row[1] > TOUCH_INTERVAL_NS:
+            with conn:
+                conn.execute("UPDATE synsets SET last_used = ? WHERE word = ?", (now, word))
+        return [
+            (tuple((name, depth) for name, depth in ancestors), root_depth, needs_root)
+            for ancestors, root_depth, needs_root in json.loads(row[0])
+        ]
+
+    def put_synsets(self, word, data):
+        self._write(
+            "synsets",
+            "INSERT OR REPLACE INTO synsets (word, data, last_used) VALUES (?, ?, ?)",
+            (word, json.dumps(data, separators=(",", ":")), time.time_ns()),
+        )
+
+    # ------------------ Bookkeeping ------------------
+    def _count(self, table, miss):
+        with self._lock:
+            if miss:
+                self.misses[table] += 1
+            else:
+                self.hits[table] += 1
+
+    def _write(self, table, sql, params):
+        """Runs one insert and bumps the shared write counter in the same transaction."""
+        conn = self._connect()
+        with conn:
+            conn.execute(sql, params)
+            conn.execute("UPDATE writes SET count = count + 1 WHERE name = ?", (table,))
+            (count,) = conn.execute("SELECT count FROM writes WHERE name = ?", (table,)).fetchone()
+        if count % EVICT_EVERY == 0:
+            self.evict(table)
+
+    def evict(self, table):
+        """Trims `table` back to max_entries rows, oldest last_used first."""
+        conn = self._connect()
+        with conn:
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    f"DELETE FROM {table} WHERE rowid IN"
+                    f" (SELECT rowid FROM {table} ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                with self._lock:
+                    self.evictions[table] += excess
+
+    def stats(self):
+        """Hit, miss and eviction counters of this process, per table."""
+        stats = {}
+        for table in TABLES:
+            hits, misses = self.hits[table], self.misses[table]
+            stats[table] = {
+                "hits": hits,
+                "misses": misses,
+                "evictions": self.evictions[table],
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        return stats
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
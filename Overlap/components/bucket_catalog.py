@@ -0,0 +1,191 @@
+"""
+Memory-mapped activity catalog.
+
+A catalog is a UTF-8 text file with one activity name per line plus a
+sidecar index (`<path>.idx`) holding:
+
+    header   b"OVLPCATX", version (u32), padding, entry count (u64), padding
+    offsets  count + 1 u64 byte offsets of each line in the data file
+    sorted   count u32 entry ids ordered by casefolded name
+
+Both files are memory-mapped and read through memoryviews, so opening a
+million-entry catalog costs no Python strings at all; names are decoded one
+at a time when a row is shown. The sorted permutation lets prefix search
+binary-search the names, and PrefixSearch narrows the previous match range
+as the user keeps typing.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"OVLPCATX"
+VERSION = 1
+_HEADER = struct.Struct("<8sI4xQ8x")  # 32 bytes, so the u64 arrays stay aligned
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def write_catalog(path, names):
+    """Writes names (any iterable, consumed once) as a catalog and builds its index."""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for name in names:
+            f.write(name.replace("\n", " ").replace("\r", " ") + "\n")
+    build_index(path)
+
+
+def build_index(path):
+    """
+    Scans the data file and writes its index. Sorting needs every casefolded
+    name in memory once, which is fine for an offline build step.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("catalog indexes are little-endian only")
+    offsets = array("Q", [0])
+    keys = []
+    with open(path, "rb") as f:
+        pos = 0
+        for line in f:
+            pos += len(line)
+            offsets.append(pos)
+            keys.append(line.rstrip(b"\r\n").decode("utf-8").casefold())
+    order = array("I", sorted(range(len(keys)), key=keys.__getitem__))
+
+    tmp = index_path(path) + f".tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(keys)))
+        f.write(offsets.tobytes())
+        f.write(order.tobytes())
+    os.replace(tmp, index_path(path))
+
+
+def _map(path):
+    """Read-only mmap of a file; empty files map to an empty bytes object."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ActivityCatalog:
+    """Read-only sequence of activity names backed by memory-mapped files."""
+
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise RuntimeError("catalog indexes are little-endian only")
+        if not os.path.exists(index_path(path)) or os.path.getmtime(index_path(path)) < os.path.getmtime(path):
+            build_index(path)
+        self.path = path
+        self._data = _map(path)
+        self._index = _map(index_path(path))
+        magic, version, count = _HEADER.unpack_from(self._index)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{index_path(path)} is not a version {VERSION} catalog index")
+        self._count = count
+        view = memoryview(self._index)
+        start = _HEADER.size
+        self._offsets = view[start:start + (count + 1) * 8].cast("Q")
+        start += (count + 1) * 8
+        self._sorted = view[start:start + count * 4].cast("I")
+
+    @classmethod
+    def from_names(cls, names, path):
+        write_catalog(path, names)
+        return cls(path)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("catalog index out of range")
+        return self._data[self._offsets[i]:self._offsets[i + 1]].decode("utf-8").rstrip("\r\n")
+
+    def sorted_id(self, rank):
+        """Entry id of the rank-th name in casefolded order."""
+        return self._sorted[rank]
+
+    def _key(self, rank, length):
+        return self[self._sorted[rank]].casefold()[:length]
+
+    def prefix_range(self, prefix, lo=0, hi=None):
+        """
+        Returns (lo, hi) such that sorted ranks lo..hi-1 are exactly the names
+        starting with prefix (case-insensitive), searching only within the
+        given rank range.
+        """
+        prefix = prefix.casefold()
+        if hi is None:
+            hi = self._count
+        n = len(prefix)
+        left, right = lo, hi
+        while left < right:
+            mid = (left + right) // 2
+            if self._key(mid, n) < prefix:
+                left = mid + 1
+            else:
+                right = mid
+        start = left
+        right = hi
+        while left < right:
+            mid = (left + right) // 2
+            if self._key(mid, n) <= prefix:
+                left = mid + 1
+            else:
+                right = mid
+        return start, left
+
+    def close(self):
+        self._offsets.release()
+        self._sorted.release()
+        for mapped in (self._data, self._index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+
+class SearchResults:
+    """Entry ids of a prefix match, as a lazy sequence in name order."""
+
+    def __init__(self, catalog, lo, hi):
+        self.catalog = catalog
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("search result index out of range")
+        return self.catalog.sorted_id(self.lo + i)
+
+
+class PrefixSearch:
+    """
+    Incremental prefix search. When the new query extends the previous one,
+    only the previous match range is searched again.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.query = ""
+        self.lo, self.hi = 0, len(catalog)
+
+    def update(self, query):
+        """Returns SearchResults for query, or None when the query is empty."""
+        if not query:
+            self.query, self.lo, self.hi = "", 0, len(self.catalog)
+            return None
+        if self.query and query.casefold().startswith(self.query.casefold()):
+            self.lo, self.hi = self.catalog.prefix_range(query, self.lo, self.hi)
+        else:
+            self.lo, self.hi = self.catalog.prefix_range(query)
+        self.query = query
+        return SearchResults(self.catalog, self.lo, self.hi)
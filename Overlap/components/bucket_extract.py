@@ -0,0 +1,236 @@
+"""
+Fast keyword extraction for templated reviews.
+
+extract_keywords_nltk spends most of its time in word_tokenize (Punkt
+sentence splitting plus the Treebank regexes) and in the averaged
+perceptron's feature extraction. Reviews built from generate_review's
+phrase tables reuse a small vocabulary in a handful of contexts, so
+FastKeywordExtractor:
+
+- tokenizes with one regex split over the text, keeping only the
+  alphabetic tokens filter_tokens would keep from word_tokenize's output
+- tags words the tagger's tagdict knows without looking at context, exactly
+  as the tagger itself does, and memoizes the perceptron's answer for every
+  other token under the full context its features read: the word, the two
+  previous tags and the normalized words two either side. A memo hit is
+  therefore always the tag pos_tag would give, and only tokens whose
+  context is new are scored.
+- optionally treats words in a noun lexicon as nouns without tagging them;
+  category_noun_lexicon() seeds one from the category_keywords patterns.
+  This can change results, so validate with the lexicon you deploy.
+
+The tokenizer follows word_tokenize closely but not exactly: a trailing
+period counts as a sentence end unless the next word is lowercase, where
+Punkt knows better about abbreviations. validate() lists texts whose
+keywords differ from extract_keywords_nltk and throughput_report() times
+both paths; `python bucket_extract.py` runs both on generated reviews.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+
+import bucket_stats
+from bucket import (
+    ReviewGenerator,
+    activities,
+    category_keywords,
+    ensure_nltk_data,
+    extract_keywords_nltk,
+    filter_tokens,
+    load_nltk,
+    select_keywords,
+)
+
+DEFAULT_MAX_MEMO = 200_000
+
+# Everything the Treebank tokenizer splits off as its own token, leaving
+# words between. Commas and colons only split when no digit follows.
+_SPLIT = re.compile(r"""[\s;@#$%&?!*"“”‘’«»`()\[\]{}<>—–]+|\.\.\.|--|[,:](?!\d)""")
+_CONTRACTION = re.compile(r"(?i)^(.+?)(?:n't|'ll|'re|'ve|'s|'m|'d|')$")
+# Treebank's CONTRACTIONS2: single words it splits in two.
+_SPLIT_WORDS = {"cannot": 3, "gimme": 3, "gonna": 3, "gotta": 3, "lemme": 3, "wanna": 3}
+
+
+def regex_tokenize(text):
+    """
+    Alphabetic tokens of text, in order, as word_tokenize would produce them
+    (everything else it yields fails filter_tokens' isalpha check anyway).
+    """
+    chunks = [c for c in _SPLIT.split(text) if c]
+    tokens = []
+    for i, chunk in enumerate(chunks):
+        chunk = chunk.lstrip("'")
+        if chunk.endswith(".") and (i + 1 == len(chunks) or not chunks[i + 1][:1].islower()):
+            chunk = chunk[:-1]
+        match = _CONTRACTION.match(chunk)
+        if match:
+            chunk = match.group(1)
+        if not chunk.isalpha():
+            continue
+        cut = _SPLIT_WORDS.get(chunk.lower())
+        if cut:
+            tokens.append(chunk[:cut])
+            tokens.append(chunk[cut:])
+        else:
+            tokens.append(chunk)
+    return tokens
+
+
+@lru_cache(maxsize=None)
+def perceptron_tagger():
+    """The averaged-perceptron tagger pos_tag uses, loaded once."""
+    return load_nltk().tag.PerceptronTagger()
+
+
+def category_noun_lexicon():
+    """Every single word of the category_keywords patterns, lowercased."""
+    return frozenset(word for patterns in category_keywords.values() for pat in patterns for word in pat.lower().split())
+
+
+class FastKeywordExtractor:
+    """Regex tokenizer plus memoized perceptron tagging; see the module docstring."""
+
+    def __init__(self, noun_lexicon=(), tagger=None, max_memo=DEFAULT_MAX_MEMO):
+        self.noun_lexicon = frozenset(word.lower() for word in noun_lexicon)
+        self._tagger = tagger
+        self.max_memo = max_memo
+        self._memo = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    @property
+    def tagger(self):
+        if self._tagger is None:
+            self._tagger = perceptron_tagger()
+        return self._tagger
+
+    def tag(self, tokens):
+        """POS tags for tokens, equal to pos_tag's when the noun lexicon is empty."""
+        tagger = self.tagger
+        get_features = getattr(tagger, "_get_features", None)
+        if get_features is None:
+            # Not a perceptron tagger; nothing to memoize safely.
+            return [tag for _, tag in tagger.tag(tokens)]
+
+        tagdict, lexicon, memo = tagger.tagdict, self.noun_lexicon, self._memo
+        context = None
+        prev, prev2 = tagger.START
+        tags = []
+        for i, word in enumerate(tokens):
+            if lexicon and word.lower() in lexicon:
+                tag = "NN"
+            else:
+                tag = tagdict.get(word)
+                if not tag:
+                    if context is None:
+                        context = tagger.START + [tagger.normalize(w) for w in tokens] + tagger.END
+                    # _get_features reads context[i..i+4] (offset by START).
+                    key = (word, prev, prev2, *context[i:i + 5])
+                    tag = memo.get(key)
+                    if tag is None:
+                        self.memo_misses += 1
+                        tag = tagger.model.predict(get_features(i, word, context, prev, prev2))
+                        if isinstance(tag, tuple):  # (tag, confidence) on newer NLTK
+                            tag = tag[0]
+                        if len(memo) >= self.max_memo:
+                            memo.clear()
+                        memo[key] = tag
+                    else:
+                        self.memo_hits += 1
+            tags.append(tag)
+            prev2, prev = prev, tag
+        return tags
+
+    def extract(self, text, num_keywords=2):
+        """Same contract as extract_keywords_nltk."""
+        t0 = bucket_stats.start()
+        filtered_tokens = filter_tokens(regex_tokenize(text))
+        t0 = bucket_stats.lap("extract_fast.tokenize", t0)
+        tagged = list(zip(filtered_tokens, self.tag(filtered_tokens)))
+        t0 = bucket_stats.lap("extract_fast.pos_tag", t0)
+        keywords = select_keywords(filtered_tokens, tagged, num_keywords)
+        bucket_stats.lap("extract_fast.select", t0)
+        return keywords
+
+    def memo_stats(self):
+        lookups = self.memo_hits + self.memo_misses
+        return {
+            "hits": self.memo_hits,
+            "misses": self.memo_misses,
+            "size": len(self._memo),
+            "hit_rate": round(self.memo_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_fast_extractor = None
+
+def get_fast_extractor():
+    global _fast_extractor
+    if _fast_extractor is None:
+        _fast_extractor = FastKeywordExtractor()
+    return _fast_extractor
+
+bucket_stats.register_cache("pos_memo", lambda: None if _fast_extractor is None else _fast_extractor.memo_stats())
+
+
+def extract_keywords_fast(text, num_keywords=2):
+    """extract_keywords_nltk through the shared FastKeywordExtractor (no noun lexicon)."""
+    return get_fast_extractor().extract(text, num_keywords)
+
+
+# ------------------ Validation ------------------
+def validate(texts, num_keywords=2, extractor=None):
+    """(index, standard keywords, fast keywords) for every text where the two differ."""
+    extractor = extractor or get_fast_extractor()
+    mismatches = []
+    for i, text in enumerate(texts):
+        expected = extract_keywords_nltk(text, num_keywords)
+        got = extractor.extract(text, num_keywords)
+        if got != expected:
+            mismatches.append((i, expected, got))
+    return mismatches
+
+
+def throughput_report(texts, num_keywords=2, extractor=None):
+    """Times the standard and fast paths over texts and checks they agree."""
+    texts = list(texts)
+    extractor = extractor or get_fast_extractor()
+    clock = time.perf_counter
+    start = clock()
+    expected = [extract_keywords_nltk(text, num_keywords) for text in texts]
+    standard = clock() - start
+    start = clock()
+    got = [extractor.extract(text, num_keywords) for text in texts]
+    fast = clock() - start
+    mismatches = sum(a != b for a, b in zip(expected, got))
+    return {
+        "texts": len(texts),
+        "standard_per_s": round(len(texts) / standard, 2) if standard else None,
+        "fast_per_s": round(len(texts) / fast, 2) if fast else None,
+        "speedup": round(standard / fast, 2) if fast else None,
+        "mismatches": mismatches,
+        "pos_memo": extractor.memo_stats(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and time fast keyword extraction on generated reviews.")
+    parser.add_argument("--size", type=int, default=2000, help="number of generated reviews")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--num-keywords", type=int, default=2)
+    parser.add_argument("--lexicon", action="store_true", help="use the category_keywords noun lexicon")
+    args = parser.parse_args(argv)
+
+    ensure_nltk_data(download=False)
+    texts = [review for _, review in ReviewGenerator(seed=args.seed).generate_many(activities, args.size)]
+    extractor = FastKeywordExtractor(category_noun_lexicon() if args.lexicon else ())
+    report = throughput_report(texts, args.num_keywords, extractor)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
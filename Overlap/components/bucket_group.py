@@ -0,0 +1,194 @@
+"""
+Group overlap across many participants' liked buckets.
+
+Each participant is encoded over a fixed BucketSpace (the category_keywords
+buckets plus "Other", 51 in all) twice: as an int bitset of the buckets
+they like, and as a float32 weight vector (PreferenceProfile.weights()).
+Intersections and unions of a group are bitwise AND/OR over the bitsets;
+the weighted overlap of a bucket is the group's mean weight for it times
+the share of participants who like it, so a bucket everyone likes a little
+can beat one a single participant loves.
+
+overlap_many() scores thousands of groups at once: all participants are
+stacked into one matrix and each group is reduced with ufunc.reduceat, so
+there is no Python loop over participants. Activities are ranked with a
+RecommendationIndex, using a group's overlap scores as bucket weights.
+
+Bitsets work without NumPy; weight vectors and overlap scores need it, and
+raise ImportError otherwise.
+"""
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from bucket import category_keywords, get_bucket_model
+from bucket_model import BucketModel
+
+# Per-group results of overlap_many(); masks are ints, overlap is a vector.
+GroupOverlap = namedtuple("GroupOverlap", ["intersection", "union", "support", "overlap"])
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Weighted group overlap requires NumPy")
+
+
+class BucketSpace:
+    """Fixed bucket numbering (BucketModel ids), shared by every participant's encoding."""
+
+    def __init__(self, table=category_keywords, model=None):
+        self.model = model if model is not None else BucketModel(table)
+        self.buckets = self.model.buckets
+        self.ids = self.model.bucket_ids
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def _id(self, bucket):
+        bid = self.ids.get(bucket)
+        if bid is None:
+            raise ValueError(f"Unknown bucket {bucket!r}")
+        return bid
+
+    def mask(self, buckets):
+        """Bitset with one bit per named bucket."""
+        mask = 0
+        for bucket in buckets:
+            mask |= 1 << self._id(bucket)
+        return mask
+
+    def names(self, mask):
+        """Bucket names set in a bitset, in space order."""
+        return [bucket for i, bucket in enumerate(self.buckets) if mask >> i & 1]
+
+    def vector(self, weights):
+        """float32 weight vector from a {bucket: weight} mapping."""
+        _require_numpy()
+        vec = np.zeros(len(self.buckets), dtype=np.float32)
+        for bucket, weight in weights.items():
+            vec[self._id(bucket)] = weight
+        return vec
+
+    def weights_of(self, participant):
+        """
+        {bucket: weight} for a PreferenceProfile, a {bucket: weight} mapping,
+        or an iterable of liked bucket names (weighted equally).
+        """
+        if hasattr(participant, "weights"):
+            return participant.weights()
+        if isinstance(participant, dict):
+            return participant
+        buckets = list(dict.fromkeys(participant))
+        return {bucket: 1 / len(buckets) for bucket in buckets}
+
+
+class Group:
+    """The participants of one meetup."""
+
+    def __init__(self, participants=(), space=None):
+        self.space = space or default_space()
+        self.masks = []
+        self._weights = []
+        self._matrix = None
+        for participant in participants:
+            self.add(participant)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def add(self, participant):
+        weights = self.space.weights_of(participant)
+        self.masks.append(self.space.mask(b for b, w in weights.items() if w > 0))
+        self._weights.append(weights)
+        self._matrix = None
+
+    # ------------------ Bitsets ------------------
+    def intersection(self):
+        """Bitset of buckets every participant likes (0 for an empty group)."""
+        if not self.masks:
+            return 0
+        mask = self.masks[0]
+        for m in self.masks[1:]:
+            mask &= m
+        return mask
+
+    def union(self):
+        """Bitset of buckets at least one participant likes."""
+        mask = 0
+        for m in self.masks:
+            mask |= m
+        return mask
+
+    def support(self):
+        """Number of participants liking each bucket, in space order."""
+        return [sum(m >> i & 1 for m in self.masks) for i in range(len(self.space))]
+
+    # ------------------ Weights ------------------
+    def matrix(self):
+        """(participants, buckets) float32 weight matrix."""
+        _require_numpy()
+        if self._matrix is None:
+            rows = [self.space.vector(w) for w in self._weights]
+            self._matrix = np.stack(rows) if rows else np.zeros((0, len(self.space)), dtype=np.float32)
+        return self._matrix
+
+    def weighted_overlap(self):
+        """Per-bucket mean weight times the share of participants liking the bucket."""
+        matrix = self.matrix()
+        if not len(matrix):
+            return np.zeros(len(self.space), dtype=np.float32)
+        return matrix.mean(axis=0) * (matrix > 0).mean(axis=0)
+
+    def bucket_scores(self):
+        """weighted_overlap() as {bucket: score} for buckets scoring above zero."""
+        overlap = self.weighted_overlap()
+        return {self.space.buckets[i]: float(overlap[i]) for i in np.flatnonzero(overlap)}
+
+    def rank(self, index, k=10, exclude=()):
+        """Top-k (activity id, score) pairs from a RecommendationIndex for this group."""
+        return index.top_k(self.bucket_scores(), k, exclude)
+
+
+# ------------------ Many Groups ------------------
+_default_space = None
+
+def default_space():
+    global _default_space
+    if _default_space is None:
+        _default_space = BucketSpace(model=get_bucket_model())
+    return _default_space
+
+
+def overlap_many(groups):
+    """
+    GroupOverlap for every group, computed with one stacked matrix and
+    reduceat instead of per-group loops. All groups must share a BucketSpace
+    of at most 64 buckets and have at least one participant.
+    """
+    _require_numpy()
+    groups = list(groups)
+    if not groups:
+        return []
+    space = groups[0].space
+    if len(space) > 64:
+        raise ValueError("overlap_many packs bitsets into uint64, so at most 64 buckets")
+    sizes = np.array([len(g) for g in groups])
+    if any(g.space is not space for g in groups) or not sizes.all():
+        raise ValueError("overlap_many needs non-empty groups over one BucketSpace")
+
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    masks = np.fromiter((m for g in groups for m in g.masks), dtype=np.uint64, count=int(sizes.sum()))
+    matrix = np.concatenate([g.matrix() for g in groups])
+
+    intersections = np.bitwise_and.reduceat(masks, starts)
+    unions = np.bitwise_or.reduceat(masks, starts)
+    support = np.add.reduceat((matrix > 0).astype(np.int32), starts, axis=0)
+    mean = np.add.reduceat(matrix, starts, axis=0) / sizes[:, None]
+    overlap = (mean * (support / sizes[:, None])).astype(np.float32)
+    return [
+        GroupOverlap(int(intersections[i]), int(unions[i]), support[i], overlap[i])
+        for i in range(len(groups))
+    ]
@@ -0,0 +1,380 @@
+"""
+Tk front end for the bucket classifier.
+
+Run with `python bucket_gui.py`. All NLP work lives in `bucket`, which this
+module only imports, so the classifier itself never needs a display.
+
+Review generation, keyword extraction and bucketing run on a small thread
+pool, never on the Tk event thread. Finished work is handed back through a
+queue that the event loop drains with root.after, since Tk widgets may only
+be touched from the thread running mainloop. Reviews for the activities
+around the current selection are prefetched so moving through the list
+usually finds them already done. The first job loads NLTK and the
+classifier tables, and every other job waits for it, so a cold start never
+has two threads loading the same corpora; WordNet reads after that are
+serialized inside `bucket`.
+
+The activity list is virtual: activities come from a memory-mapped
+ActivityCatalog and the listbox only ever holds the rows in view, refilled
+as the scrollbar or mouse wheel moves. Pass a catalog file as the first
+argument to browse it; otherwise the built-in sample list is used.
+"""
+import os
+import queue
+import sys
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+from bucket import (
+    ReviewGenerator,
+    activities,
+    enable_snapshot,
+    extract_keywords_nltk,
+    find_buckets_for_keywords,
+    load_nltk,
+    warm_up,
+)
+from bucket_catalog import ActivityCatalog, PrefixSearch
+from bucket_profile import PreferenceProfile
+
+# How often the event loop checks for finished background work
+POLL_MS = 30
+# Activities on each side of the selection to analyze ahead of time
+PREFETCH_RADIUS = 3
+WORKER_THREADS = 2
+# Liked-bucket profile saved on exit and restored on the next start
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "overlap", "liked_profile.bin")
+# Warm-start snapshot (see bucket_snapshot) used when present
+SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "overlap", "warm_snapshot.bin")
+# Catalog file written from the built-in sample list when none is given
+SAMPLE_CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "overlap", "sample_catalog.txt")
+# Rows kept in the listbox; a little more than fit on screen
+VISIBLE_ROWS = 40
+
+
+def warm_up_analysis():
+    """Loads NLTK and the classifier tables before any analysis runs."""
+    load_nltk()
+    warm_up()
+
+
+def analyze_activity(generator, activity_text):
+    """Generates a review and classifies its keywords; returns (review, keywords, buckets)."""
+    review = generator.generate(activity_text)
+    keywords, buckets = analyze_review(review)
+    return review, keywords, buckets
+
+
+def analyze_review(review):
+    """Returns (keywords, buckets) for a review."""
+    keywords = extract_keywords_nltk(review)
+    return keywords, find_buckets_for_keywords(keywords, workers=1)
+
+
+class RecommendationApp:
+    """Activity list, generated review, and the liked-bucket summary."""
+
+    def __init__(self, root, catalog, profile=None, profile_path=None):
+        self.root = root
+        # Any sequence of names works; an ActivityCatalog also enables search.
+        self.catalog = catalog
+        self.search = PrefixSearch(catalog) if isinstance(catalog, ActivityCatalog) else None
+        # Catalog indexes currently listed (everything, or search matches) and
+        # the position in that view of the first listbox row.
+        self.view = range(len(catalog))
+        self.top = 0
+        # Liked keywords grouped by bucket
+        self.profile = profile if profile is not None else PreferenceProfile()
+        self.profile_path = profile_path
+
+        self.generator = ReviewGenerator()
+        self.executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="bucket")
+        self.ready = self.executor.submit(warm_up_analysis)
+        self.results = queue.Queue()
+        # activity index -> future of analyze_activity, for the selection and its neighbours
+        self.analyses = {}
+        # Bumped on every selection so results for older selections are dropped
+        self.selection_token = 0
+        self.selected_index = None
+
+        # ----------------------- GUI Setup -----------------------
+        root.title("Activity Recommendation with NLTK Keyword Extraction")
+        root.geometry("1000x650")
+
+        style = ttk.Style()
+        style.theme_use("clam")
+
+        main_frame = ttk.Frame(root, padding="10")
+        main_frame.grid(row=0, column=0, sticky="nsew")
+        root.columnconfigure(0, weight=1)
+        root.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.columnconfigure(1, weight=2)
+        main_frame.rowconfigure(0, weight=1)
+
+        # Left frame: List of activities
+        left_frame = ttk.Frame(main_frame)
+        left_frame.grid(row=0, column=0, sticky="nsew", padx=(0,10))
+        activities_label = ttk.Label(left_frame, text="Activities", font=("Helvetica", 14, "bold"))
+        activities_label.pack(anchor="w")
+        if self.search is not None:
+            self.search_var = tk.StringVar()
+            search_entry = ttk.Entry(left_frame, textvariable=self.search_var)
+            search_entry.pack(fill="x", pady=(5, 0))
+            search_entry.bind("<KeyRelease>", self.on_search)
+        self.activity_listbox = tk.Listbox(left_frame, height=20, font=("Helvetica", 12), exportselection=False)
+        self.activity_listbox.pack(side="left", fill="both", expand=True, pady=5)
+        self.list_scrollbar = ttk.Scrollbar(left_frame, orient="vertical", command=self.on_scroll)
+        self.list_scrollbar.pack(side="right", fill="y")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.activity_listbox.bind(sequence, self.on_mouse_wheel)
+        self.render_rows()
+
+        # Right frame: Activity details and review display
+        right_frame = ttk.Frame(main_frame, relief="sunken", padding="10")
+        right_frame.grid(row=0, column=1, sticky="nsew")
+        details_label = ttk.Label(right_frame, text="Activity Details", font=("Helvetica", 14, "bold"))
+        details_label.pack(anchor="w")
+
+        self.details_text = tk.Text(right_frame, wrap="word", font=("Helvetica", 12), height=8)
+        self.details_text.pack(fill="both", expand=True, pady=5)
+        self.details_text.config(state="disabled")
+
+        review_label = ttk.Label(right_frame, text="Generated Review for the Activity:", font=("Helvetica", 12))
+        review_label.pack(anchor="w", pady=(10,0))
+        self.review_text = tk.Text(right_frame, wrap="word", font=("Helvetica", 12), height=4)
+        self.review_text.pack(fill="both", expand=True, pady=5)
+
+        button_frame = ttk.Frame(right_frame)
+        button_frame.pack(fill="x", pady=5)
+        like_button = ttk.Button(button_frame, text="Like Activity", command=self.on_like_activity)
+        like_button.pack(side="left", padx=(0, 10))
+        dislike_button = ttk.Button(button_frame, text="Dislike Activity", command=self.on_dislike_activity)
+        dislike_button.pack(side="left")
+
+        liked_buckets_label = ttk.Label(right_frame, text="Liked Buckets:", font=("Helvetica", 12, "bold"))
+        liked_buckets_label.pack(anchor="w", pady=(10,0))
+        self.liked_buckets_display = ttk.Label(right_frame, text="", font=("Helvetica", 12))
+        self.liked_buckets_display.pack(anchor="w")
+
+        self.activity_listbox.bind("<<ListboxSelect>>", self.on_activity_select)
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        root.after(POLL_MS, self.drain_results)
+
+    # ----------------------- Background Work -----------------------
+    def submit(self, func, *args, on_done):
+        """
+        Runs func(*args) on the pool. on_done(result) is later called on the
+        Tk thread by drain_results; exceptions are reported in the details panel.
+        """
+        future = self.executor.submit(self.when_ready, func, *args)
+        future.add_done_callback(lambda f: self.results.put((f, on_done)))
+        return future
+
+    def when_ready(self, func, *args):
+        """Runs func(*args) once the warm-up job has finished, re-raising its error."""
+        self.ready.result()
+        return func(*args)
+
+    def drain_results(self):
+        while True:
+            try:
+                future, on_done = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                self.show_details(f"Background task failed: {error}\n")
+            else:
+                on_done(future.result())
+        self.root.after(POLL_MS, self.drain_results)
+
+    def analysis_for(self, index):
+        """Returns the future analyzing catalog entry `index`, starting it if needed."""
+        future = self.analyses.get(index)
+        if future is None or future.cancelled():
+            future = self.executor.submit(self.when_ready, analyze_activity, self.generator, self.catalog[index])
+            self.analyses[index] = future
+        return future
+
+    def prefetch_around(self, pos):
+        """
+        Starts analyses for view position `pos` and its neighbours in the
+        current view, nearest first, and forgets the ones that moved out of
+        range, cancelling any still queued.
+        """
+        positions = range(max(0, pos - PREFETCH_RADIUS), min(len(self.view), pos + PREFETCH_RADIUS + 1))
+        wanted = [self.view[p] for p in sorted(positions, key=lambda p: abs(p - pos))]
+        for other in [i for i in self.analyses if i not in wanted]:
+            self.analyses.pop(other).cancel()
+        for index in wanted:
+            self.analysis_for(index)
+
+    # ----------------------- Virtual List -----------------------
+    def render_rows(self):
+        """Refills the listbox with the rows of the view starting at self.top."""
+        end = min(len(self.view), self.top + VISIBLE_ROWS)
+        self.activity_listbox.delete(0, tk.END)
+        for pos in range(self.top, end):
+            self.activity_listbox.insert(tk.END, self.catalog[self.view[pos]])
+            if self.view[pos] == self.selected_index:
+                self.activity_listbox.selection_set(pos - self.top)
+        total = len(self.view) or 1
+        self.list_scrollbar.set(self.top / total, end / total)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.view) - VISIBLE_ROWS // 2))
+        if top != self.top:
+            self.top = top
+            self.render_rows()
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")."""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.view)))
+        elif action == "scroll":
+            step = VISIBLE_ROWS // 2 if unit == "pages" else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def on_mouse_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"
+
+    def on_search(self, event=None):
+        results = self.search.update(self.search_var.get().strip())
+        self.view = range(len(self.catalog)) if results is None else results
+        self.top = 0
+        self.render_rows()
+
+    def on_close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.profile_path:
+            os.makedirs(os.path.dirname(self.profile_path), exist_ok=True)
+            self.profile.save(self.profile_path)
+        self.root.destroy()
+
+    # ----------------------- Liked Buckets -----------------------
+    def add_liked_keywords(self, keywords, buckets):
+        """Add each keyword to its bucket in the profile, skipping duplicates."""
+        self.profile.add_many(keywords, buckets)
+
+    def refresh_liked_display(self):
+        # The profile only re-renders the buckets that changed since last time.
+        self.liked_buckets_display.config(text=self.profile.render())
+
+    def prepopulate(self, activity_names):
+        """Pre-populate liked buckets from generated reviews of the given activities, in the background."""
+        def collect():
+            keywords = []
+            for activity in activity_names:
+                keywords.extend(extract_keywords_nltk(self.generator.generate(activity)))
+            return keywords, find_buckets_for_keywords(keywords)
+
+        def apply(result):
+            self.add_liked_keywords(*result)
+            self.refresh_liked_display()
+
+        self.liked_buckets_display.config(text="Loading liked buckets...")
+        self.submit(collect, on_done=apply)
+
+    # ----------------------- Event Handling -----------------------
+    def show_details(self, text):
+        self.details_text.config(state="normal")
+        self.details_text.delete("1.0", tk.END)
+        self.details_text.insert(tk.END, text)
+        self.details_text.config(state="disabled")
+
+    def show_review(self, review):
+        self.review_text.delete("1.0", tk.END)
+        self.review_text.insert(tk.END, review)
+
+    def on_activity_select(self, event):
+        """Update details panel and show the activity's review once it is generated."""
+        selection = event.widget.curselection()
+        if selection:
+            pos = self.top + selection[0]
+            index = self.view[pos]
+            activity_text = self.catalog[index]
+            self.show_details(f"Activity: {activity_text}\n")
+            self.selection_token += 1
+            self.selected_index = index
+            token = self.selection_token
+
+            self.prefetch_around(pos)
+            future = self.analysis_for(index)
+            if future.done() and not future.exception():
+                self.show_review(future.result()[0])
+            else:
+                self.show_review("")
+
+                def show(result):
+                    if token == self.selection_token:
+                        self.show_review(result[0])
+
+                future.add_done_callback(lambda f: self.results.put((f, show)))
+
+    def on_like_activity(self):
+        """Extract keywords from the generated review and add them to liked buckets if the activity is liked."""
+        review = self.review_text.get("1.0", tk.END).strip()
+        if review:
+            def apply(result):
+                self.add_liked_keywords(*result)
+                self.refresh_liked_display()
+
+            future = self.analyses.get(self.selected_index)
+            if future is not None and future.done() and not future.exception() and future.result()[0].strip() == review:
+                # Keywords for this review were already extracted in the background.
+                apply(future.result()[1:])
+            else:
+                self.submit(analyze_review, review, on_done=apply)
+        else:
+            self.liked_buckets_display.config(text="No review text available to extract keywords.")
+
+    def on_dislike_activity(self):
+        """Handle activity dislike: no keywords are stored."""
+        self.liked_buckets_display.config(text="Activity disliked. No keywords added.")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        catalog = ActivityCatalog(argv[0])
+    else:
+        os.makedirs(os.path.dirname(SAMPLE_CATALOG_PATH), exist_ok=True)
+        catalog = ActivityCatalog.from_names(activities, SAMPLE_CATALOG_PATH)
+
+    root = tk.Tk()
+    snapshot = None
+    if os.path.exists(SNAPSHOT_PATH):
+        try:
+            snapshot = enable_snapshot(SNAPSHOT_PATH)
+        except (OSError, ValueError):
+            snapshot = None
+    profile = None
+    if os.path.exists(PROFILE_PATH):
+        try:
+            profile = PreferenceProfile.load(PROFILE_PATH)
+        except (OSError, ValueError):
+            profile = None
+    if profile is None and snapshot is not None:
+        try:
+            profile = snapshot.profile()
+        except ValueError:
+            profile = None
+    app = RecommendationApp(root, catalog, profile=profile, profile_path=PROFILE_PATH)
+    if profile is None:
+        # Pre-populate liked buckets for the first 50 activities
+        app.prepopulate(catalog[:50])
+    else:
+        app.refresh_liked_display()
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compact, interned model of the bucket table and classified activities.
+
+Buckets and patterns are numbered once, in category_keywords order, and
+every structure that used to hold display strings holds these small ints
+instead:
+
+- bucket ids 0..len(table)-1 follow the table, and "Other" (the fallback
+  bucket) is the last id unless the table names it itself
+- pattern ids follow first appearance, so a pattern listed under several
+  buckets ("dining", "restaurant") is stored once
+- bucket -> patterns and pattern -> buckets are CSR-style array("H") tables:
+  an id array plus an offsets array, sliced without building lists
+
+Per-activity bucket ids live in RecommendationIndex's array("H") column.
+Names are produced only at the edge, by the string API in bucket.py, which
+is a thin view over these ids.
+"""
+import sys
+from array import array
+
+OTHER_BUCKET = "Other"
+
+
+def _csr(rows):
+    """(offsets, ids) arrays for a list of id lists."""
+    offsets, ids = array("I", [0]), array("H")
+    for row in rows:
+        ids.extend(row)
+        offsets.append(len(ids))
+    return offsets, ids
+
+
+class BucketModel:
+    """Bucket and pattern id tables for one category table."""
+
+    def __init__(self, table):
+        self.buckets = [sys.intern(bucket) for bucket in table]
+        if OTHER_BUCKET not in table:
+            self.buckets.append(OTHER_BUCKET)
+        self.bucket_ids = {bucket: bid for bid, bucket in enumerate(self.buckets)}
+        self.other_id = self.bucket_ids[OTHER_BUCKET]
+
+        self.patterns = []
+        self.pattern_ids = {}
+        # (bucket id, pattern id) for every table entry, in table order
+        self.entry_buckets = array("H")
+        self.entry_patterns = array("H")
+        bucket_rows = [[] for _ in self.buckets]
+        pattern_rows = []
+        for bid, patterns in enumerate(table.values()):
+            for pat in patterns:
+                pid = self.pattern_ids.get(pat)
+                if pid is None:
+                    pid = self.pattern_ids[pat] = len(self.patterns)
+                    self.patterns.append(sys.intern(pat))
+                    pattern_rows.append([])
+                self.entry_buckets.append(bid)
+                self.entry_patterns.append(pid)
+                if pid not in bucket_rows[bid]:
+                    bucket_rows[bid].append(pid)
+                if bid not in pattern_rows[pid]:
+                    pattern_rows[pid].append(bid)
+        self._bucket_offsets, self._bucket_patterns = _csr(bucket_rows)
+        self._pattern_offsets, self._pattern_buckets = _csr(pattern_rows)
+
+    def __len__(self):
+        return len(self.buckets)
+
+    # ------------------ Id Tables ------------------
+    def patterns_of(self, bucket_id):
+        """Pattern ids listed under a bucket, in table order."""
+        return self._bucket_patterns[self._bucket_offsets[bucket_id]:self._bucket_offsets[bucket_id + 1]]
+
+    def buckets_of(self, pattern_id):
+        """Ids of every bucket listing a pattern, in table order."""
+        return self._pattern_buckets[self._pattern_offsets[pattern_id]:self._pattern_offsets[pattern_id + 1]]
+
+    # ------------------ String Views ------------------
+    def bucket_name(self, bucket_id):
+        return self.buckets[bucket_id]
+
+    def bucket_id(self, bucket):
+        """Id of a bucket name; raises ValueError for a name not in the table."""
+        bid = self.bucket_ids.get(bucket)
+        if bid is None:
+            raise ValueError(f"Unknown bucket {bucket!r}")
+        return bid
+
+    def patterns_for(self, bucket):
+        return [self.patterns[pid] for pid in self.patterns_of(self.bucket_id(bucket))]
+
+    def buckets_for_pattern(self, pattern):
+        """Names of every bucket listing pattern (empty for an unknown pattern)."""
+        pid = self.pattern_ids.get(pattern)
+        if pid is None:
+            return []
+        return [self.buckets[bid] for bid in self.buckets_of(pid)]
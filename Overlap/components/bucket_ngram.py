@@ -0,0 +1,105 @@
+"""
+Fast, offline approximate bucket classifier.
+
+Keywords and category patterns are represented as hashed character n-gram
+vectors (feature hashing with CRC32, so vectors are identical across
+processes). Each bucket's centroid is the normalized mean of its pattern
+and name-word vectors (leaving out GENERIC_NAME_WORDS), and a keyword is scored against every bucket with a
+single matrix-vector product. The score is a cosine similarity in [0, 1]
+and doubles as the confidence used to decide whether to escalate to
+WordNet.
+
+Requires NumPy; importing this module without it works, but building a
+classifier raises ImportError.
+"""
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+DEFAULT_FEATURES = 1 << 12
+DEFAULT_NGRAM_RANGE = (2, 4)
+# Bucket-name words that say what kind of place it is rather than what
+# happens there ("City Tour Service", "Brunch Spot"). Reviews use them
+# everywhere, so they are kept out of the centroids.
+GENERIC_NAME_WORDS = frozenset(
+    ["agency", "center", "class", "club", "hall", "house", "service", "site", "spot", "store", "studio", "venue"]
+)
+
+
+def char_ngrams(word, ngram_range=DEFAULT_NGRAM_RANGE):
+    """Character n-grams of the lowercased word with "<" and ">" boundary marks."""
+    text = f"<{word.lower()}>"
+    lo, hi = ngram_range
+    return [text[i:i + n] for n in range(lo, hi + 1) for i in range(len(text) - n + 1)]
+
+
+class NgramBucketClassifier:
+    """Cosine similarity of hashed n-gram vectors against bucket centroids."""
+
+    def __init__(self, table, n_features=DEFAULT_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE):
+        if np is None:
+            raise ImportError("The n-gram classifier tier requires NumPy")
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.buckets = list(table)
+        self._feature_memo = {}
+
+        centroids = np.zeros((len(self.buckets), n_features), dtype=np.float32)
+        for row, (bucket, patterns) in enumerate(table.items()):
+            words = list(patterns) + [w for w in bucket.replace("&", " ").split() if w.lower() not in GENERIC_NAME_WORDS]
+            for word in words:
+                centroids[row] += self.vectorize(word)
+            norm = np.linalg.norm(centroids[row])
+            if norm:
+                centroids[row] /= norm
+        self.centroids = centroids
+
+    def _feature_index(self, gram):
+        index = self._feature_memo.get(gram)
+        if index is None:
+            index = self._feature_memo[gram] = zlib.crc32(gram.encode("utf-8")) % self.n_features
+        return index
+
+    def vectorize(self, word):
+        """L2-normalized hashed n-gram count vector for one word."""
+        vec = np.zeros(self.n_features, dtype=np.float32)
+        for gram in char_ngrams(word, self.ngram_range):
+            vec[self._feature_index(gram)] += 1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def scores(self, keyword):
+        """Cosine similarity of keyword against every bucket, in table order."""
+        return self.centroids @ self.vectorize(keyword)
+
+    def classify_id(self, keyword):
+        """
+        Returns (bucket index in table order, confidence); the index is None
+        when no n-gram is shared.
+        """
+        scores = self.scores(keyword)
+        best = int(np.argmax(scores))
+        confidence = float(scores[best])
+        return (best if confidence > 0 else None), confidence
+
+    def classify(self, keyword):
+        """Returns (bucket, confidence); bucket is None when no n-gram is shared."""
+        best, confidence = self.classify_id(keyword)
+        return (None if best is None else self.buckets[best]), confidence
+
+    def classify_many(self, keywords):
+        """(bucket, confidence) for each keyword, scored with one matrix product."""
+        keywords = list(keywords)
+        if not keywords:
+            return []
+        matrix = np.stack([self.vectorize(kw) for kw in keywords])
+        scores = matrix @ self.centroids.T
+        best = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(keywords)), best]
+        return [
+            (self.buckets[b] if c > 0 else None, float(c))
+            for b, c in zip(best.tolist(), confidences.tolist())
+        ]
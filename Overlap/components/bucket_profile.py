@@ -0,0 +1,203 @@
+"""
+Liked-bucket preference profile.
+
+Replaces the old `liked_buckets` dict of lists. Keywords and buckets are
+interned to small integer ids, each bucket keeps an insertion-ordered
+keyword id -> like count map (O(1) dedupe), and the display text is kept
+per bucket so a new like only re-renders the buckets it touched.
+
+Profiles snapshot to a compact binary file:
+
+    header   b"OVLPPROF", version (u16), keyword count, bucket count,
+             entry count (u32 each), string table size in bytes (u64)
+    strings  keyword names, then bucket names, UTF-8, NUL-separated
+    entries  three little-endian u32 arrays: bucket id, keyword id, count,
+             in insertion order
+
+Restoring reads the arrays with array.frombytes, so a profile with 100k
+likes loads in milliseconds.
+"""
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"OVLPPROF"
+VERSION = 1
+_HEADER = struct.Struct("<8sHIIIQ")
+
+
+class PreferenceProfile:
+    """Keywords a user liked, grouped by bucket, with per-bucket counts."""
+
+    def __init__(self):
+        self.keyword_ids = {}
+        self.keywords = []
+        self.bucket_ids = {}
+        self.buckets = []
+        # bucket id -> {keyword id: like count}, in first-liked order
+        self.members = []
+        # bucket id -> total likes, duplicates included
+        self.counts = []
+        self.total = 0
+        self._lines = []
+        self._dirty = set()
+
+    # ------------------ Interning ------------------
+    def _keyword_id(self, keyword):
+        kid = self.keyword_ids.get(keyword)
+        if kid is None:
+            kid = self.keyword_ids[keyword] = len(self.keywords)
+            self.keywords.append(sys.intern(keyword))
+        return kid
+
+    def _bucket_id(self, bucket):
+        bid = self.bucket_ids.get(bucket)
+        if bid is None:
+            bid = self.bucket_ids[bucket] = len(self.buckets)
+            self.buckets.append(sys.intern(bucket))
+            self.members.append({})
+            self.counts.append(0)
+            self._lines.append(None)
+        return bid
+
+    # ------------------ Updates ------------------
+    def add(self, keyword, bucket, count=1):
+        """Records a like of keyword in bucket. Returns True if the keyword is new to the bucket."""
+        bid = self._bucket_id(bucket)
+        kid = self._keyword_id(keyword)
+        members = self.members[bid]
+        is_new = kid not in members
+        members[kid] = members.get(kid, 0) + count
+        self.counts[bid] += count
+        self.total += count
+        if is_new:
+            self._dirty.add(bid)
+        return is_new
+
+    def add_many(self, keywords, buckets):
+        """Adds (keyword, bucket) pairs; returns the names of buckets that gained a keyword."""
+        changed = []
+        for kw, bucket in zip(keywords, buckets):
+            if self.add(kw, bucket) and bucket not in changed:
+                changed.append(bucket)
+        return changed
+
+    # ------------------ Queries ------------------
+    def __len__(self):
+        return len(self.buckets)
+
+    def __contains__(self, bucket):
+        return bucket in self.bucket_ids
+
+    def keywords_for(self, bucket):
+        bid = self.bucket_ids.get(bucket)
+        if bid is None:
+            return []
+        return [self.keywords[kid] for kid in self.members[bid]]
+
+    def count(self, bucket):
+        bid = self.bucket_ids.get(bucket)
+        return 0 if bid is None else self.counts[bid]
+
+    def weights(self):
+        """Share of all likes per bucket, summing to 1 (empty for an empty profile)."""
+        if not self.total:
+            return {}
+        return {bucket: self.counts[bid] / self.total for bid, bucket in enumerate(self.buckets)}
+
+    def as_dict(self):
+        """The old liked_buckets shape: {bucket: [keywords in first-liked order]}."""
+        return {bucket: self.keywords_for(bucket) for bucket in self.buckets}
+
+    # ------------------ Display ------------------
+    def render(self):
+        """
+        Returns the liked-bucket summary, one "Bucket: kw, kw" line per bucket.
+        Only buckets that gained keywords since the last call are re-joined.
+        """
+        for bid in self._dirty:
+            kws = ", ".join(self.keywords[kid] for kid in self.members[bid])
+            self._lines[bid] = f"{self.buckets[bid]}: {kws}\n"
+        self._dirty.clear()
+        return "".join(self._lines)
+
+    # ------------------ Snapshots ------------------
+    def save(self, path):
+        """Writes a binary snapshot atomically (write to a temp file, then rename)."""
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Restores a profile written by save(). Raises ValueError on a foreign or newer file."""
+        with open(path, "rb") as f:
+            data = f.read()
+        return cls.from_bytes(data, path)
+
+    def to_bytes(self):
+        """The snapshot save() writes, as bytes."""
+        bucket_col, keyword_col, count_col = array("I"), array("I"), array("I")
+        for bid, members in enumerate(self.members):
+            for kid, n in members.items():
+                bucket_col.append(bid)
+                keyword_col.append(kid)
+                count_col.append(n)
+        if sys.byteorder != "little":
+            for col in (bucket_col, keyword_col, count_col):
+                col.byteswap()
+
+        strings = "\0".join(self.keywords + self.buckets).encode("utf-8")
+        header = _HEADER.pack(MAGIC, VERSION, len(self.keywords), len(self.buckets), len(count_col), len(strings))
+        return b"".join([header, strings, bucket_col.tobytes(), keyword_col.tobytes(), count_col.tobytes()])
+
+    @classmethod
+    def from_bytes(cls, data, source="data"):
+        """
+        Restores a profile from to_bytes() output (bytes or any buffer, such
+        as a memoryview into a larger file). Raises ValueError on a foreign or
+        newer format, and on truncated or inconsistent data; `source` names
+        the data in those messages.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{source} is not a version {VERSION} preference profile")
+        magic, version, n_keywords, n_buckets, n_entries, strings_size = _HEADER.unpack_from(data)
+        if magic != MAGIC or version > VERSION:
+            raise ValueError(f"{source} is not a version {VERSION} preference profile")
+        expected = _HEADER.size + strings_size + 3 * n_entries * array("I").itemsize
+        if len(data) != expected:
+            raise ValueError(f"{source} is {len(data)} bytes, but its header describes {expected}")
+
+        pos = _HEADER.size
+        names = bytes(data[pos:pos + strings_size]).decode("utf-8").split("\0") if n_keywords + n_buckets else []
+        if len(names) != n_keywords + n_buckets:
+            raise ValueError(f"{source} names {len(names)} keywords and buckets, not {n_keywords + n_buckets}")
+        pos += strings_size
+
+        cols = []
+        for _ in range(3):
+            col = array("I")
+            col.frombytes(data[pos:pos + n_entries * col.itemsize])
+            if sys.byteorder != "little":
+                col.byteswap()
+            cols.append(col)
+            pos += n_entries * col.itemsize
+        if n_entries and (max(cols[0]) >= n_buckets or max(cols[1]) >= n_keywords):
+            raise ValueError(f"{source} has an entry with a bucket or keyword id out of range")
+
+        profile = cls()
+        profile.keywords = [sys.intern(name) for name in names[:n_keywords]]
+        profile.keyword_ids = {kw: kid for kid, kw in enumerate(profile.keywords)}
+        for bucket in names[n_keywords:]:
+            profile._bucket_id(bucket)
+        if len(profile.keyword_ids) != n_keywords or len(profile.buckets) != n_buckets:
+            raise ValueError(f"{source} repeats a keyword or bucket name")
+        members, counts = profile.members, profile.counts
+        for bid, kid, n in zip(*cols):
+            members[bid][kid] = n
+            counts[bid] += n
+        profile.total = sum(counts)
+        profile._dirty.update(range(len(profile.buckets)))
+        return profile
@@ -0,0 +1,198 @@
+"""
+Top-k activity recommendations from liked-bucket weights.
+
+Every activity belongs to one bucket, so an activity's score is simply the
+weight of its bucket in the user's PreferenceProfile.weights(). The index
+keeps, per bucket, the ids of its activities in ascending order (an
+array("I") posting list). A query merges the posting lists of the buckets
+the user likes with a heap keyed on (-weight, activity id) and stops after
+k results, so its cost depends on k and the number of liked buckets, never
+on the size of the catalog.
+
+Activities are classified once, when they are added, and their buckets are
+numbered with bucket.get_bucket_model() ids, like every classifier tier.
+Indexes snapshot to a compact binary file:
+
+    header   b"OVLPRIDX", version (u16), padding, SHA-256 of category_keywords
+             (32 bytes), catalog file size and mtime in ns (u64 each, 0 for an
+             in-memory catalog), bucket count, activity count (u32 each),
+             bucket name table size in bytes (u64)
+    names    bucket names, UTF-8, NUL-separated
+    buckets  one u16 bucket id per activity, little-endian
+
+check() compares the recorded table hash and catalog fingerprint with the
+current ones, so a caller can rebuild a stale file instead of serving
+recommendations from it.
+"""
+import heapq
+import os
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from bucket import category_keywords, find_buckets_for_keywords, get_bucket_model
+from bucket_cache import table_hash
+
+MAGIC = b"OVLPRIDX"
+VERSION = 2
+_HEADER = struct.Struct("<8sH6x32sQQIIQ")
+
+
+def _table_digest(table):
+    return bytes.fromhex(table_hash(table))
+
+
+def _fingerprint(source):
+    """(size, mtime in ns) of the catalog file at source, or (0, 0) without one."""
+    if source is None:
+        return 0, 0
+    st = os.stat(source)
+    return st.st_size, st.st_mtime_ns
+
+
+def _keyed(neg_weight, posting):
+    for aid in posting:
+        yield neg_weight, aid
+
+
+class RecommendationIndex:
+    """Inverted index from bucket to activity ids, with heap-based top-k queries."""
+
+    def __init__(self, model=None):
+        self.model = model if model is not None else get_bucket_model()
+        self.bucket_ids = self.model.bucket_ids
+        self.buckets = self.model.buckets
+        # bucket id -> ascending activity ids
+        self.postings = [array("I") for _ in self.buckets]
+        # activity id -> bucket id
+        self.activity_buckets = array("H")
+        # what a loaded index was built from; see check()
+        self.table_digest = None
+        self.source_fingerprint = None
+
+    def __len__(self):
+        return len(self.activity_buckets)
+
+    # ------------------ Updates ------------------
+    def add_id(self, bucket_id):
+        """Appends an activity already classified into bucket_id; returns its activity id."""
+        aid = len(self.activity_buckets)
+        self.activity_buckets.append(bucket_id)
+        self.postings[bucket_id].append(aid)
+        return aid
+
+    def add(self, bucket):
+        """add_id() by bucket name; raises ValueError for a bucket not in the model."""
+        return self.add_id(self.model.bucket_id(bucket))
+
+    def add_activities(self, activities, workers=1):
+        """
+        Classifies activity names with find_buckets_for_keywords and appends
+        them, in order. Returns the id of the first one added.
+        """
+        first = len(self.activity_buckets)
+        for bucket in find_buckets_for_keywords(list(activities), workers=workers):
+            self.add(bucket)
+        return first
+
+    @classmethod
+    def build(cls, activities, workers=None, model=None):
+        """Index over a whole catalog (any sequence of names), classified in parallel."""
+        index = cls(model)
+        index.add_activities(activities, workers=workers)
+        return index
+
+    # ------------------ Queries ------------------
+    def bucket_of(self, activity_id):
+        return self.buckets[self.activity_buckets[activity_id]]
+
+    def activities_in(self, bucket):
+        """Ids of the activities in bucket, ascending."""
+        bid = self.bucket_ids.get(bucket)
+        return array("I") if bid is None else self.postings[bid]
+
+    def top_k(self, weights, k=10, exclude=()):
+        """
+        The k highest-scoring activities as (activity id, score) pairs, best
+        first; equal scores go to the lower id. weights maps bucket names to
+        scores (e.g. PreferenceProfile.weights()); activities in buckets with
+        no positive weight are never returned. `exclude` is a container of
+        activity ids to skip.
+        """
+        streams = []
+        for bucket, weight in weights.items():
+            bid = self.bucket_ids.get(bucket)
+            if bid is not None and weight > 0 and self.postings[bid]:
+                streams.append(_keyed(-weight, self.postings[bid]))
+        merged = heapq.merge(*streams)
+        if exclude:
+            merged = (item for item in merged if item[1] not in exclude)
+        return [(aid, -neg_weight) for neg_weight, aid in islice(merged, k)]
+
+    # ------------------ Snapshots ------------------
+    def save(self, path, source=None, table=None):
+        """
+        Writes the index atomically; postings are rebuilt on load. `source`
+        is the path of the catalog file the activities came from, if any, and
+        `table` the category table they were classified with (default:
+        bucket.category_keywords); both are recorded for check().
+        """
+        column = array("H", self.activity_buckets)
+        if sys.byteorder != "little":
+            column.byteswap()
+        names = "\0".join(self.buckets).encode("utf-8")
+        digest = _table_digest(category_keywords if table is None else table)
+        size, mtime_ns = _fingerprint(source)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, digest, size, mtime_ns, len(self.buckets), len(column), len(names)))
+            f.write(names)
+            f.write(column.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, model=None):
+        """
+        Restores an index written by save(). Raises ValueError on a foreign,
+        older or newer file, or one naming a bucket the model does not have.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is not a version {VERSION} recommendation index")
+        magic, version, digest, size, mtime_ns, n_buckets, n_activities, names_size = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recommendation index")
+        pos = _HEADER.size
+        names = data[pos:pos + names_size].decode("utf-8").split("\0") if n_buckets else []
+        pos += names_size
+        column = array("H")
+        column.frombytes(data[pos:pos + n_activities * column.itemsize])
+        if sys.byteorder != "little":
+            column.byteswap()
+
+        index = cls(model)
+        if names != index.buckets[:len(names)]:
+            # Written under another table: renumber by name.
+            ids = [index.model.bucket_id(name) for name in names]
+            column = array("H", (ids[bid] for bid in column))
+        index.activity_buckets = column
+        index.table_digest = digest
+        index.source_fingerprint = (size, mtime_ns)
+        postings = index.postings
+        for aid, bid in enumerate(column):
+            postings[bid].append(aid)
+        return index
+
+    def check(self, path, source=None, table=None):
+        """
+        Raises ValueError unless this loaded index was saved for the same
+        category table (default: bucket.category_keywords) and the same
+        catalog file, unchanged in size and mtime. `path` names the index
+        file in the message.
+        """
+        if self.table_digest != _table_digest(category_keywords if table is None else table):
+            raise ValueError(f"{path} was built for a different category table")
+        if self.source_fingerprint != _fingerprint(source):
+            raise ValueError(f"{path} was built from a different or modified catalog")
@@ -0,0 +1,411 @@
+"""
+Local HTTP/JSON service around the bucket classifier.
+
+Run with `python bucket_service.py [--port 8765] [catalog]`. The server binds
+to 127.0.0.1 by default and uses only the standard library, so it can be
+load-tested without any outside services. Every endpoint takes a JSON
+object in a POST body and answers with a JSON object:
+
+    POST /classify          {"keyword": str} or {"keywords": [str]}
+    POST /extract_keywords  {"text": str, "num_keywords": int = 2}
+    POST /like              {"user": str, "keywords": [str]} or {"user": str, "text": str}
+    POST /recommend         {"user": str, "k": int = 10}  (see bucket_recommend)
+    GET  /health, GET /stats
+
+NLTK work runs on an executor: warmed worker processes from
+bucket.worker_pool() by default, or threads with --threads (WordNet reads
+are then serialized by bucket's lock). At most `max_concurrency` jobs run at once and
+at most `max_pending` may wait for a slot; beyond that requests are turned
+away with 503 and a Retry-After header instead of queueing without bound.
+Keyword lists (/classify batches, /like, /extract_keywords) hold at most
+MAX_BATCH_KEYWORDS keywords and are classified as one executor job, and
+concurrent requests for the same keyword share one computation whether
+they asked for it alone or in a batch.
+
+Liked buckets are kept per user in memory as PreferenceProfiles and are
+only touched from the event loop thread.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import bucket
+from bucket_catalog import ActivityCatalog
+from bucket_profile import PreferenceProfile
+from bucket_recommend import RecommendationIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_PENDING = 64
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH_KEYWORDS = 1000
+
+
+class RequestError(Exception):
+    """A request the service refuses, carrying the HTTP status to answer with."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _result_dict(result):
+    return {"bucket": result.bucket, "tier": result.tier, "confidence": result.confidence}
+
+
+def _classify_all(keywords):
+    return [bucket.classify_keyword(kw) for kw in keywords]
+
+
+def _build_index(source):
+    """RecommendationIndex over a catalog file path or a sequence of names, on one worker."""
+    if isinstance(source, str):
+        catalog = ActivityCatalog(source)
+        try:
+            return RecommendationIndex.build(catalog, 1)
+        finally:
+            catalog.close()
+    return RecommendationIndex.build(source, 1)
+
+
+def _settle(keywords, futures, job):
+    """Copies the result of a _classify_all job onto each keyword's future."""
+    if job.cancelled():
+        for kw in keywords:
+            futures[kw].cancel()
+    elif job.exception() is not None:
+        for kw in keywords:
+            futures[kw].set_exception(job.exception())
+    else:
+        for kw, result in zip(keywords, job.result()):
+            futures[kw].set_result(result)
+
+
+class BucketService:
+    """Request handlers plus the executor, backpressure and coalescing state."""
+
+    def __init__(self, activities=None, executor=None, max_concurrency=DEFAULT_CONCURRENCY, max_pending=DEFAULT_MAX_PENDING, index=None):
+        self.activities = bucket.activities if activities is None else activities
+        # RecommendationIndex over activities, built on the first /recommend if not given
+        self.index = index
+        # the executor job building it, shared by every /recommend that waits on it
+        self._index_job = None
+        self.executor = executor or bucket.worker_pool(max_concurrency)
+        self.max_pending = max_pending
+        self.profiles = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+        # keyword -> future of its BucketResult, while one is in flight
+        self._inflight = {}
+        self._routes = {
+            ("POST", "/classify"): self.handle_classify,
+            ("POST", "/extract_keywords"): self.handle_extract_keywords,
+            ("POST", "/like"): self.handle_like,
+            ("POST", "/recommend"): self.handle_recommend,
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/stats"): self.handle_stats,
+        }
+
+    # ------------------ Executor ------------------
+    async def run_blocking(self, func, *args):
+        """
+        Runs func(*args) on the executor once a concurrency slot is free.
+        Raises a 503 RequestError when too many jobs are already waiting.
+        """
+        if self._pending >= self.max_pending:
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later", {"Retry-After": "1"})
+        self._pending += 1
+        try:
+            async with self._slots:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    def _futures(self, keywords):
+        """
+        {keyword: future BucketResult} for the unique keywords. Those not
+        already in flight are classified together in one executor job, which
+        keeps running even if the request that started it goes away.
+        """
+        futures, missing = {}, []
+        for kw in dict.fromkeys(keywords):
+            future = self._inflight.get(kw)
+            if future is None:
+                missing.append(kw)
+            else:
+                futures[kw] = future
+        if missing:
+            loop = asyncio.get_running_loop()
+            for kw in missing:
+                future = futures[kw] = self._inflight[kw] = loop.create_future()
+                future.add_done_callback(functools.partial(self._forget, kw))
+            job = asyncio.ensure_future(self.run_blocking(_classify_all, missing))
+            job.add_done_callback(lambda job: _settle(missing, futures, job))
+        return futures
+
+    def _forget(self, keyword, future):
+        if self._inflight.get(keyword) is future:
+            del self._inflight[keyword]
+
+    async def classify(self, keyword):
+        """BucketResult for keyword, shared with concurrent requests for it."""
+        return await asyncio.shield(self._futures([keyword])[keyword])
+
+    async def classify_keywords(self, keywords):
+        """BucketResults for keywords, in order; duplicates are classified once."""
+        futures = self._futures(keywords)
+        results = dict(zip(futures, await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))))
+        return [results[kw] for kw in keywords]
+
+    # ------------------ Handlers ------------------
+    async def handle_classify(self, body):
+        if "keywords" in body:
+            keywords = _keyword_list(body, "keywords")
+            results = await self.classify_keywords(keywords)
+            return {"results": [dict(_result_dict(r), keyword=kw) for kw, r in zip(keywords, results)]}
+        keyword = _string(body, "keyword")
+        return dict(_result_dict(await self.classify(keyword)), keyword=keyword)
+
+    async def handle_extract_keywords(self, body):
+        text = _string(body, "text")
+        num_keywords = _int(body, "num_keywords", 2)
+        if num_keywords > MAX_BATCH_KEYWORDS:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_BATCH_KEYWORDS} keywords per request")
+        keywords = await self.run_blocking(bucket.extract_keywords_nltk, text, num_keywords)
+        results = await self.classify_keywords(keywords)
+        return {"keywords": keywords, "buckets": [r.bucket for r in results]}
+
+    async def handle_like(self, body):
+        user = _string(body, "user")
+        if "keywords" in body:
+            keywords = _keyword_list(body, "keywords")
+        else:
+            keywords = await self.run_blocking(bucket.extract_keywords_nltk, _string(body, "text"))
+        buckets = [r.bucket for r in await self.classify_keywords(keywords)]
+        profile = self.profiles.get(user)
+        if profile is None:
+            profile = self.profiles[user] = PreferenceProfile()
+        new_buckets = profile.add_many(keywords, buckets)
+        return {"keywords": keywords, "buckets": buckets, "new_buckets": new_buckets, "liked": profile.as_dict()}
+
+    async def handle_recommend(self, body):
+        user = _string(body, "user")
+        k = _int(body, "k", 10)
+        if self.index is None:
+            if self._index_job is None:
+                # An mmap-backed catalog cannot be pickled to a worker process, so
+                # the job reopens it by path rather than listing it on the event loop.
+                source = self.activities.path if isinstance(self.activities, ActivityCatalog) else self.activities
+                self._index_job = asyncio.ensure_future(self.run_blocking(_build_index, source))
+                self._index_job.add_done_callback(self._index_built)
+            # Shielded, so a client that disconnects does not cancel the build for the others.
+            await asyncio.shield(self._index_job)
+        profile = self.profiles.get(user)
+        weights = profile.weights() if profile is not None else {}
+        return {
+            "user": user,
+            "recommendations": [
+                {"activity": self.activities[aid], "bucket": self.index.bucket_of(aid), "score": score}
+                for aid, score in self.index.top_k(weights, k)
+            ],
+        }
+
+    def _index_built(self, job):
+        if job.cancelled() or job.exception() is not None:
+            # Let the next /recommend try again.
+            self._index_job = None
+        else:
+            self.index = job.result()
+
+    async def handle_health(self, body):
+        return {"status": "ok", "pending": self._pending, "inflight_keywords": len(self._inflight)}
+
+    async def handle_stats(self, body):
+        return bucket.get_stats()
+
+    # ------------------ HTTP ------------------
+    async def dispatch(self, method, path, raw_body):
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+            raise RequestError(HTTPStatus.NOT_FOUND, f"no endpoint {path}")
+        body = {}
+        if raw_body:
+            try:
+                body = json.loads(raw_body)
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {exc}")
+            if not isinstance(body, dict):
+                raise RequestError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        return await handler(body)
+
+    async def handle_connection(self, reader, writer):
+        """Serves HTTP/1.1 requests on one connection, keeping it alive between requests."""
+        try:
+            while True:
+                headers, head_too_long = {}, False
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    # A line longer than the StreamReader limit.
+                    request_line, head_too_long = b"", True
+                parts = request_line.decode("latin-1").split()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                extra_headers = {}
+                try:
+                    if head_too_long:
+                        keep_alive = False
+                        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "request line or header too long")
+                    if len(parts) != 3:
+                        keep_alive = False
+                        raise RequestError(HTTPStatus.BAD_REQUEST, "malformed request line")
+                    method, target, _ = parts
+                    length = _content_length(headers)
+                    if length is None:
+                        keep_alive = False
+                        raise RequestError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body larger than {MAX_BODY_BYTES} bytes")
+                    raw_body = await reader.readexactly(length) if length else b""
+                    status, payload = HTTPStatus.OK, await self.dispatch(method, target.split("?", 1)[0], raw_body)
+                except RequestError as exc:
+                    status, payload, extra_headers = exc.status, {"error": str(exc)}, exc.headers
+                except bucket.MissingNLTKDataError as exc:
+                    status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)}
+                except Exception as exc:
+                    print(f"Error handling {request_line!r}: {exc!r}", file=sys.stderr)
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+
+                data = json.dumps(payload).encode("utf-8")
+                head = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                head += [f"{name}: {value}" for name, value in extra_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ------------------ Request Validation ------------------
+def _content_length(headers):
+    """Declared body size, or None when the header is not a non-negative integer."""
+    value = headers.get("content-length", "0") or "0"
+    if not value.isdigit():
+        return None
+    return int(value)
+
+
+def _string(body, key):
+    value = body.get(key)
+    if not isinstance(value, str) or not value:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{key!r} must be a non-empty string")
+    return value
+
+
+def _string_list(body, key):
+    value = body.get(key)
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{key!r} must be a list of non-empty strings")
+    return value
+
+
+def _keyword_list(body, key):
+    keywords = _string_list(body, key)
+    if len(keywords) > MAX_BATCH_KEYWORDS:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_BATCH_KEYWORDS} keywords per request")
+    return keywords
+
+
+def _int(body, key, default):
+    value = body.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{key!r} must be a positive integer")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the bucket classifier over local HTTP.")
+    parser.add_argument("catalog", nargs="?", help="activity catalog to recommend from (default: built-in sample)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="executor jobs running at once")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING, help="jobs allowed to wait before answering 503")
+    parser.add_argument("--threads", action="store_true", help="run NLTK work on threads instead of warmed worker processes")
+    parser.add_argument("--index", metavar="PATH", help="recommendation index to load, or to build and save at startup")
+    parser.add_argument("--snapshot", metavar="PATH", help="warm-start snapshot to answer known keywords from")
+    args = parser.parse_args(argv)
+
+    bucket.ensure_nltk_data(download=False)
+    if args.snapshot:
+        bucket.enable_snapshot(args.snapshot)
+    activities = ActivityCatalog(args.catalog) if args.catalog else None
+    index = None
+    if args.index:
+        catalog = activities if activities is not None else bucket.activities
+        if os.path.exists(args.index):
+            try:
+                index = RecommendationIndex.load(args.index)
+                index.check(args.index, args.catalog)
+                if len(index) != len(catalog):
+                    raise ValueError(f"{args.index} indexes {len(index)} activities, not {len(catalog)}")
+            except ValueError as exc:
+                print(f"{exc}; rebuilding", file=sys.stderr)
+                index = None
+        if index is None:
+            index = RecommendationIndex.build(catalog)
+            index.save(args.index, args.catalog)
+    if args.threads:
+        executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="bucket-service")
+    else:
+        executor = bucket.worker_pool(args.concurrency)
+
+    async def run():
+        service = BucketService(activities, executor, args.concurrency, args.max_pending, index)
+        print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+        try:
+            await service.serve(args.host, args.port)
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Warm-start snapshot of classifier state.
+
+A fresh process normally loads WordNet, resolves the synsets of every
+category pattern and re-classifies each keyword it meets. A snapshot file
+carries that work over:
+
+    header    b"OVLPSNAP", version (u16), classifier mode (u8), padding,
+              n-gram threshold (f64), SHA-256 of category_keywords (32 bytes),
+              keyword count (u64)
+    sections  (offset, size) u64 pairs for each section below, 8-byte aligned:
+      keys        known keywords, UTF-8, concatenated in byte order
+      offsets     count + 1 u64 offsets of each key in `keys`
+      buckets     count u16 bucket ids (bucket.get_bucket_model() numbering)
+      tiers       count u8 indexes into TIERS
+      confidence  count f64 confidences, NaN where classify_keyword gave None
+      ancestors   JSON {pattern: word_ancestors(pattern)} for every pattern
+      profile     a PreferenceProfile.to_bytes() blob, or empty
+
+The file is memory-mapped and the keyword table is read through
+memoryviews, so opening it costs no per-keyword work and known keywords
+are answered by binary search without importing NLTK. The ancestor JSON
+and the profile are decoded only when first asked for. Substring hits are
+left out, since the automaton answers those without NLTK anyway.
+
+Build one with `python bucket_snapshot.py OUT` (see --help), then call
+bucket.enable_snapshot(OUT) in each process.
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import bucket
+from bucket_cache import table_hash
+from bucket_profile import PreferenceProfile
+
+MAGIC = b"OVLPSNAP"
+VERSION = 1
+TIERS = ("substring", "ngram", "wordnet")
+SECTIONS = ("keys", "offsets", "buckets", "tiers", "confidence", "ancestors", "profile")
+_HEADER = struct.Struct("<8sHB5xd32sQ")
+_SECTION = struct.Struct("<QQ")
+
+
+def _table_digest(table):
+    return bytes.fromhex(table_hash(table))
+
+
+# ------------------ Writing ------------------
+def write_snapshot(path, keywords, profile=None):
+    """
+    Classifies keywords with the current classifier configuration and writes
+    them, the pattern synset data and an optional PreferenceProfile to path.
+    Runs the full classifier, so NLTK must be available.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("snapshots are little-endian only")
+    model = bucket.get_bucket_model()
+    mode, threshold = bucket.configure_classifier()
+
+    known = []
+    for keyword in sorted(set(keywords), key=lambda kw: kw.encode("utf-8")):
+        bucket_id, tier, confidence = bucket.classify_keyword_id(keyword)
+        if tier != "substring":
+            known.append((keyword, bucket_id, tier, confidence))
+
+    keys = bytearray()
+    offsets, buckets, tiers, confidences = array("Q", [0]), array("H"), array("B"), array("d")
+    for keyword, bucket_id, tier, confidence in known:
+        keys += keyword.encode("utf-8")
+        offsets.append(len(keys))
+        buckets.append(bucket_id)
+        tiers.append(TIERS.index(tier))
+        confidences.append(math.nan if confidence is None else confidence)
+    ancestors = {pat: bucket.word_ancestors(pat) for pat in model.patterns}
+
+    blobs = [
+        bytes(keys),
+        offsets.tobytes(),
+        buckets.tobytes(),
+        tiers.tobytes(),
+        confidences.tobytes(),
+        json.dumps(ancestors, separators=(",", ":")).encode("utf-8"),
+        profile.to_bytes() if profile is not None else b"",
+    ]
+    pos = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table = []
+    for blob in blobs:
+        pos += -pos % 8
+        table.append((pos, len(blob)))
+        pos += len(blob)
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, bucket.CLASSIFIER_MODES.index(mode), threshold,
+                             _table_digest(bucket.category_keywords), len(known)))
+        for section in table:
+            f.write(_SECTION.pack(*section))
+        for (offset, _), blob in zip(table, blobs):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+    os.replace(tmp, path)
+    return len(known)
+
+
+# ------------------ Reading ------------------
+class WarmSnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise RuntimeError("snapshots are little-endian only")
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, mode, threshold, digest, count = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} classifier snapshot")
+        self.mode = bucket.CLASSIFIER_MODES[mode]
+        self.threshold = threshold
+        self.table_digest = digest
+        self._count = count
+
+        view = memoryview(self._map)
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, size = _SECTION.unpack_from(self._map, _HEADER.size + i * _SECTION.size)
+            sections[name] = view[offset:offset + size]
+        self._sections = sections
+        self._offsets = sections["offsets"].cast("Q")
+        self._buckets = sections["buckets"].cast("H")
+        self._tiers = sections["tiers"]
+        self._confidence = sections["confidence"].cast("d")
+        self._keys_start = _SECTION.unpack_from(self._map, _HEADER.size)[0]
+        self._ancestors = None
+
+    def __len__(self):
+        return self._count
+
+    def check(self, table, mode, threshold):
+        """Raises ValueError unless the snapshot was built for this table and classifier setting."""
+        if self.table_digest != _table_digest(table):
+            raise ValueError(f"{self.path} was built for a different category table")
+        if self.mode != mode or (mode == "hybrid" and self.threshold != threshold):
+            raise ValueError(f"{self.path} was built for classifier mode {self.mode!r} (threshold {self.threshold})")
+
+    def _key(self, i):
+        start = self._keys_start
+        return self._map[start + self._offsets[i]:start + self._offsets[i + 1]]
+
+    def lookup(self, keyword):
+        """(bucket id, tier, confidence) for a known keyword, or None."""
+        target = keyword.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count or self._key(lo) != target:
+            return None
+        confidence = self._confidence[lo]
+        return self._buckets[lo], TIERS[self._tiers[lo]], None if math.isnan(confidence) else confidence
+
+    def ancestors(self, word):
+        """word_ancestors() data for a category pattern, or None for any other word."""
+        if self._ancestors is None:
+            self._ancestors = json.loads(bytes(self._sections["ancestors"]))
+        data = self._ancestors.get(word)
+        if data is None:
+            return None
+        return tuple(
+            (tuple((name, depth) for name, depth in ancestors), root_depth, needs_root)
+            for ancestors, root_depth, needs_root in data
+        )
+
+    def profile(self):
+        """The PreferenceProfile stored in the snapshot, or None."""
+        blob = self._sections["profile"]
+        if not len(blob):
+            return None
+        return PreferenceProfile.from_bytes(blob, self.path)
+
+    def close(self):
+        for section in self._sections.values():
+            section.release()
+        for cast in (self._offsets, self._buckets, self._confidence):
+            cast.release()
+        self._map.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a warm-start classifier snapshot.")
+    parser.add_argument("output")
+    parser.add_argument("--vocab", help="extra keywords to include, one per line")
+    parser.add_argument("--reviews", type=int, default=1000, help="generated reviews to harvest keywords from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", help="PreferenceProfile file to embed")
+    args = parser.parse_args(argv)
+
+    bucket.ensure_nltk_data(download=False)
+    keywords = set(bucket.activities)
+    generator = bucket.ReviewGenerator(seed=args.seed)
+    for _, review in generator.generate_many(bucket.activities, args.reviews):
+        keywords.update(bucket.extract_keywords_nltk(review))
+    if args.vocab:
+        with open(args.vocab, encoding="utf-8") as f:
+            keywords.update(line.strip() for line in f if line.strip())
+    profile = PreferenceProfile.load(args.profile) if args.profile else None
+    count = write_snapshot(args.output, keywords, profile)
+    print(f"Wrote {count} keywords to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
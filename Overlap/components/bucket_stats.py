@@ -0,0 +1,178 @@
+"""
+Low-overhead stage timing and counters for the classifier hot paths.
+
+Instrumented code brackets each stage like this:
+
+    t0 = bucket_stats.start()
+    tokens = word_tokenize(text)
+    t0 = bucket_stats.lap("extract.word_tokenize", t0)
+
+While stats are disabled (the default) start() returns 0 and lap() returns
+immediately, so the cost is two cheap calls per stage. When enabled, each
+stage keeps a count, total and max latency, and a log2 histogram of
+nanoseconds from which p50/p99 are estimated. Caches register a callable
+returning their counters and are reported alongside.
+
+Enable with enable() or by setting OVERLAP_BUCKET_STATS=1 in the
+environment; get_stats() returns everything as a JSON-ready dict and
+start_periodic_dump() writes it to a file at a fixed interval.
+"""
+import json
+import os
+import threading
+import time
+
+_HISTOGRAM_SLOTS = 64
+
+enabled = os.environ.get("OVERLAP_BUCKET_STATS", "") not in ("", "0")
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_caches = {}
+_dump_thread = None
+_dump_stop = threading.Event()
+
+
+class StageStats:
+    __slots__ = ("count", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # slot i counts samples with bit_length(ns) == i, i.e. ns < 2**i
+        self.histogram = [0] * _HISTOGRAM_SLOTS
+
+    def add(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.histogram[min(ns.bit_length(), _HISTOGRAM_SLOTS - 1)] += 1
+
+    def percentile_us(self, q):
+        """Upper bound of the histogram slot holding the q-th sample, in microseconds."""
+        target = q * self.count
+        seen = 0
+        for slot, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= target:
+                return min(2 ** slot, self.max_ns) / 1000
+        return self.max_ns / 1000
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "mean_us": round(self.total_ns / self.count / 1000, 3) if self.count else 0.0,
+            "max_us": round(self.max_ns / 1000, 3),
+            "p50_us": round(self.percentile_us(0.50), 3),
+            "p99_us": round(self.percentile_us(0.99), 3),
+            "histogram_ns": {f"<{2 ** slot}": n for slot, n in enumerate(self.histogram) if n},
+        }
+
+
+# ------------------ Recording ------------------
+def enable(flag=True):
+    global enabled
+    enabled = bool(flag)
+
+
+def start():
+    """Timestamp for the first stage, or 0 when stats are off."""
+    return time.perf_counter_ns() if enabled else 0
+
+
+def lap(stage, t0):
+    """Records the time since t0 under `stage` and returns a timestamp for the next stage."""
+    if not t0:
+        return 0
+    now = time.perf_counter_ns()
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.add(now - t0)
+    return now
+
+
+def incr(counter, n=1):
+    """Bumps a named counter (a no-op while stats are off)."""
+    if enabled:
+        with _lock:
+            _counters[counter] = _counters.get(counter, 0) + n
+
+
+def register_cache(name, info):
+    """
+    Reports a cache in get_stats(). `info` returns either a
+    functools.lru_cache CacheInfo or a dict of counters.
+    """
+    _caches[name] = info
+
+
+def _cache_dict(info):
+    if isinstance(info, dict):
+        return info
+    # lru_cache: every miss inserts, so anything beyond currsize was evicted.
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "evictions": max(0, info.misses - info.currsize) if info.maxsize is not None else 0,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+# ------------------ Reporting ------------------
+def get_stats():
+    """Stage latencies, counters and cache statistics as a JSON-ready dict."""
+    with _lock:
+        stages = {name: stats.as_dict() for name, stats in sorted(_stages.items())}
+        counters = dict(sorted(_counters.items()))
+    caches = {}
+    for name, info in sorted(_caches.items()):
+        value = info()
+        if value is not None:
+            caches[name] = _cache_dict(value)
+    return {"enabled": enabled, "stages": stages, "counters": counters, "caches": caches}
+
+
+def reset():
+    """Clears stage timings and counters (cache counters belong to the caches)."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def dump(path):
+    """Writes get_stats() to path as JSON, atomically."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(dict(get_stats(), timestamp=time.time()), f, indent=2)
+    os.replace(tmp, path)
+
+
+def start_periodic_dump(path, interval=60.0):
+    """Dumps stats to path every `interval` seconds from a daemon thread."""
+    global _dump_thread
+    stop_periodic_dump()
+    _dump_stop.clear()
+
+    def run():
+        while not _dump_stop.wait(interval):
+            dump(path)
+
+    _dump_thread = threading.Thread(target=run, name="bucket-stats-dump", daemon=True)
+    _dump_thread.start()
+
+
+def stop_periodic_dump():
+    global _dump_thread
+    if _dump_thread is not None:
+        _dump_stop.set()
+        _dump_thread.join()
+        _dump_thread = None
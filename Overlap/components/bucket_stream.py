@@ -0,0 +1,132 @@
+"""
+Streaming keyword extraction over large review corpora.
+
+Reviews are pulled lazily from a file or any iterable and processed in
+fixed-size chunks: tokenize, POS-tag the whole chunk in one call, pick
+keywords, then classify the chunk's unique keywords. Only one chunk is ever
+held in memory, so peak memory depends on chunk_size, not corpus size.
+
+    python bucket_stream.py reviews.jsonl > keywords.jsonl
+
+Input lines are either JSON objects with "id" and "text" fields or plain
+text, in which case the 1-based line number is the review id.
+"""
+import argparse
+import json
+import sys
+from itertools import islice
+
+import bucket_stats
+from bucket import (
+    enable_snapshot,
+    enable_stats,
+    filter_tokens,
+    find_buckets_for_keywords,
+    load_nltk,
+    select_keywords,
+    worker_pool,
+)
+
+DEFAULT_CHUNK_SIZE = 512
+
+
+def read_reviews(path):
+    """Yields (review_id, text) from a JSONL or plain-text file, one line at a time."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                yield record.get("id", line_no), record["text"]
+            else:
+                yield line_no, line
+
+
+def _as_records(reviews):
+    """Accepts (review_id, text) pairs or bare strings, numbering the latter from 0."""
+    for i, review in enumerate(reviews):
+        if isinstance(review, str):
+            yield i, review
+        else:
+            yield review
+
+
+def stream_keywords(reviews, num_keywords=2, chunk_size=DEFAULT_CHUNK_SIZE, classify=True, workers=1):
+    """
+    Yields (review_id, keywords, buckets) for every review, in input order.
+
+    `reviews` is any iterable of (review_id, text) pairs or plain strings and
+    is consumed lazily. Keywords match extract_keywords_nltk(text,
+    num_keywords) and buckets match find_bucket_for_keyword on each keyword.
+    With classify=False, buckets is an empty list. `workers` is passed to
+    find_buckets_for_keywords for each chunk; with more than one, a single
+    worker_pool() serves the whole stream and is shut down when it ends.
+    """
+    pool = worker_pool(workers) if classify and workers > 1 else None
+    try:
+        yield from _stream_chunks(reviews, num_keywords, chunk_size, classify, workers, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _stream_chunks(reviews, num_keywords, chunk_size, classify, workers, pool):
+    nltk = load_nltk()
+    records = _as_records(reviews)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        t0 = bucket_stats.start()
+        filtered = [filter_tokens(nltk.word_tokenize(text)) for _, text in chunk]
+        t0 = bucket_stats.lap("stream.tokenize_filter", t0)
+        tagged = nltk.pos_tag_sents(filtered)
+        t0 = bucket_stats.lap("stream.pos_tag", t0)
+        keywords = [
+            select_keywords(tokens, tags, num_keywords) for tokens, tags in zip(filtered, tagged)
+        ]
+        t0 = bucket_stats.lap("stream.select", t0)
+        if classify:
+            flat = [kw for kws in keywords for kw in kws]
+            buckets = iter(find_buckets_for_keywords(flat, workers=workers, executor=pool))
+            bucket_stats.lap("stream.classify", t0)
+        for (review_id, _), kws in zip(chunk, keywords):
+            yield review_id, kws, [next(buckets) for _ in kws] if classify else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract keywords and buckets from a review corpus.")
+    parser.add_argument("path", help="JSONL ({\"id\", \"text\"}) or plain-text file, one review per line")
+    parser.add_argument("--num-keywords", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="processes used to classify each chunk")
+    parser.add_argument("--no-buckets", action="store_true", help="skip bucket classification")
+    parser.add_argument("--stats", metavar="PATH", help="record stage timings and write them here as JSON")
+    parser.add_argument("--stats-interval", type=float, default=60.0, help="seconds between --stats dumps")
+    parser.add_argument("--snapshot", metavar="PATH", help="warm-start snapshot to answer known keywords from")
+    args = parser.parse_args(argv)
+    if args.snapshot:
+        enable_snapshot(args.snapshot)
+    if args.stats:
+        enable_stats(dump_path=args.stats, dump_interval=args.stats_interval)
+
+    for review_id, keywords, buckets in stream_keywords(
+        read_reviews(args.path),
+        num_keywords=args.num_keywords,
+        chunk_size=args.chunk_size,
+        classify=not args.no_buckets,
+        workers=args.workers,
+    ):
+        record = {"id": review_id, "keywords": keywords}
+        if not args.no_buckets:
+            record["buckets"] = buckets
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if args.stats:
+        enable_stats(False)
+        bucket_stats.dump(args.stats)
+
+
+if __name__ == "__main__":
+    main()